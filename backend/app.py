@@ -7,10 +7,12 @@ from datetime import datetime
 import enum
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, ForeignKey, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql import table, column
 import os
+import re
 
 # Database setup - using SQLite for simplicity (no MySQL needed)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./african_lms.db"
@@ -75,6 +77,37 @@ class Resource(Base):
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+# Full-text index over approved resources, kept in sync by triggers
+resources_fts = table("resources_fts", column("rowid"))
+
+with engine.begin() as connection:
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts "
+        "USING fts5(title, description, tags, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS resources_fts_ai AFTER INSERT ON resources WHEN new.is_approved = 1 BEGIN
+            INSERT INTO resources_fts (rowid, title, description, tags) VALUES (new.id, new.title, new.description, new.tags);
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS resources_fts_au AFTER UPDATE OF title, description, tags, is_approved ON resources BEGIN
+            DELETE FROM resources_fts WHERE rowid = old.id;
+            INSERT INTO resources_fts (rowid, title, description, tags)
+                SELECT new.id, new.title, new.description, new.tags WHERE new.is_approved = 1;
+        END"""
+    ))
+    connection.execute(text(
+        """CREATE TRIGGER IF NOT EXISTS resources_fts_ad AFTER DELETE ON resources BEGIN
+            DELETE FROM resources_fts WHERE rowid = old.id;
+        END"""
+    ))
+    if not connection.execute(text("SELECT COUNT(*) FROM resources_fts")).scalar():
+        connection.execute(text(
+            "INSERT INTO resources_fts (rowid, title, description, tags) "
+            "SELECT id, title, description, tags FROM resources WHERE is_approved = 1"
+        ))
+
 # Pydantic Models
 class UserBase(BaseModel):
     username: str
@@ -242,10 +275,21 @@ def get_resources(
     subject: Optional[str] = None,
     grade_level: Optional[str] = None,
     country: Optional[str] = None,
+    q: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     query = db.query(Resource).filter(Resource.is_approved == True)
     
+    if q:
+        # Ranked full-text search, every word matching as a prefix
+        terms = re.findall(r"\w+", q.lower())
+        if not terms:
+            return []
+        match = " AND ".join([f'"{term}"*' for term in terms])
+        query = query.join(resources_fts, resources_fts.c.rowid == Resource.id).filter(
+            text("resources_fts MATCH :q")
+        ).params(q=match).order_by(text("bm25(resources_fts, 10.0, 2.0, 5.0)"), Resource.id)
+    
     if subject:
         query = query.filter(Resource.subject.ilike(f"%{subject}%"))
     if grade_level:
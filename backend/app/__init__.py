@@ -1,11 +1,27 @@
 # backend/app/__init__.py
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routes import users, resources, translations, ratings
+from fastapi.staticfiles import StaticFiles
+from .database import engine, Base, SessionLocal
+from . import migrations
+from .routes import users, resources, translations, ratings, jobs, imports, sync
+from .routes import bundles as bundle_routes
+from . import ussd, session_store
+from .menu_cache import menu_cache
+from .search import search_index
+from .pagination import NEXT_CURSOR_HEADER
+from .view_counter import view_counter
+from . import change_feed
+from .blob_store import UploadLimitMiddleware
+from .http_cache import ConditionalGetMiddleware
+from .tts_store import TTS_ROOT, TTS_URL_PREFIX
+from .bundles import BUNDLE_ROOT, BUNDLE_URL_PREFIX, BundleFiles
+from .bundles import refresh as refresh_bundles
 
-# Create database tables
+# Create database tables, then bring existing ones up to date
 Base.metadata.create_all(bind=engine)
+migrations.migrate(engine)
 
 app = FastAPI(title="African LMS API", version="1.0.0")
 
@@ -16,13 +32,66 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Content-Range", "Accept-Ranges"],
 )
+app.add_middleware(UploadLimitMiddleware)
+# ETags, 304s and compression for the catalogue
+app.add_middleware(ConditionalGetMiddleware)
+
+# Synthesized audio, see tts_store
+os.makedirs(TTS_ROOT, exist_ok=True)
+app.mount(TTS_URL_PREFIX, StaticFiles(directory=TTS_ROOT), name="audio")
+# Packed regional catalogues, see bundles
+os.makedirs(BUNDLE_ROOT, exist_ok=True)
+app.mount(BUNDLE_URL_PREFIX, BundleFiles(directory=BUNDLE_ROOT), name="bundles")
 
 # Include routers
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(resources.router, prefix="/api/v1/resources", tags=["resources"])
 app.include_router(translations.router, prefix="/api/v1/translations", tags=["translations"])
 app.include_router(ratings.router, prefix="/api/v1/ratings", tags=["ratings"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(imports.router, prefix="/api/v1/imports", tags=["imports"])
+app.include_router(sync.router, prefix="/api/v1/sync", tags=["sync"])
+app.include_router(bundle_routes.router, prefix="/api/v1/bundles", tags=["bundles"])
+app.include_router(ussd.router, prefix="/api/v1", tags=["ussd"])
+
+@app.on_event("startup")
+def setup_search_index():
+    search_index.setup(engine)
+
+@app.on_event("startup")
+def warm_ussd_menus():
+    db = SessionLocal()
+    try:
+        menu_cache.warm(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def backfill_change_log():
+    db = SessionLocal()
+    try:
+        change_feed.backfill(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def refresh_catalogue_bundles():
+    db = SessionLocal()
+    try:
+        refresh_bundles(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def flush_ussd_sessions():
+    # Write back sessions that are still live so they can be recovered
+    session_store.write_back_all(session_store.session_store)
+
+@app.on_event("shutdown")
+def flush_view_counts():
+    view_counter.close()
 
 @app.get("/")
 def read_root():
@@ -2,6 +2,8 @@
 import requests
 from typing import Optional
 import os
+from .summarizer import summarize
+from .tts_store import tts_store
 
 # Stub functions for AI services - in production, integrate with actual APIs
 class AIServices:
@@ -34,28 +36,17 @@ class AIServices:
         """
         Generate a summary of the text
         """
-        # This is a stub - in production, integrate with a summarization API
-        print(f"Summarizing text in {language}: {text[:50]}...")
-        
-        # Simple mock summary
-        sentences = text.split('. ')
-        if len(sentences) > 3:
-            summary = '. '.join(sentences[:3]) + '.'
-        else:
-            summary = text
-            
-        return summary
+        # Extractive: the most central sentences, see summarizer.py. Stored
+        # summaries are read from the summaries table instead of calling this.
+        return summarize(text)
     
     def text_to_speech(self, text: str, language: str = "en") -> Optional[str]:
         """
         Convert text to speech and return audio file path
         """
-        # This is a stub - in production, integrate with a TTS API
-        print(f"Converting text to speech in {language}: {text[:50]}...")
-        
-        # In a real implementation, this would generate an audio file
-        # and return the path to it
-        return f"/audio/{language}/{hash(text)}.mp3"
+        # Generated once per text and language by the configured synthesizer
+        _, relative_path, _, _ = tts_store.ensure_file(text, language)
+        return tts_store.url_for(relative_path)
 
 # Global instance
 ai_services = AIServices()
\ No newline at end of file
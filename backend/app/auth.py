@@ -2,35 +2,49 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from . import models, schemas
-from .database import get_db
+from .async_database import get_async_db
+from .hashing import pwd_context, hashing_pool
+from .principals import Principal, principal_cache
 
 # Secret key and algorithm for JWT
 SECRET_KEY = "your-secret-key-here"  # Change this in production!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt runs on the dedicated hashing pool, never on the request thread
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hashing_pool.run(pwd_context.hash, password)
 
 def authenticate_user(db: Session, username: str, password: str):
     user = db.query(models.User).filter(models.User.username == username).first()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = hashing_pool.run(pwd_context.verify_and_update, password, user.password_hash)
+    if not valid:
         return False
+    if new_hash:
+        # The hash was made with another bcrypt cost, store it with the current one
+        user.password_hash = new_hash
+        db.commit()
     return user
 
+def token_claims(user) -> dict:
+    """
+    Claims identifying a user in an access token: username, id and role
+    """
+    return {"sub": user.username, "uid": user.id, "role": models.UserRole(user.role).value}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -41,7 +55,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -50,16 +64,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id = payload.get("uid")
         if username is None:
             raise credentials_exception
-        token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
-    if user is None:
+    # Tokens carry the user id, so most requests are served from the cache.
+    # Role and verification always come from the cached principal, which is
+    # dropped when they change, never from the token.
+    if user_id is not None:
+        principal = principal_cache.get(user_id)
+        if principal is not None and principal.username == username:
+            return principal
+        query = select(models.User).filter(models.User.id == user_id)
+    else:
+        # Tokens issued before the uid claim
+        query = select(models.User).filter(models.User.username == username)
+    
+    result = await db.execute(query)
+    user = result.scalars().first()
+    if user is None or user.username != username:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(principal)
+    return principal
 
 async def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
@@ -0,0 +1,227 @@
+# backend/app/blob_store.py
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, event, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from starlette.responses import JSONResponse
+
+from . import models
+from .database import engine
+
+BLOB_ROOT = os.getenv("BLOB_ROOT", os.path.join("uploads", "blobs"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+CHUNK_SIZE = 1024 * 1024
+
+def _too_large():
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File is larger than {MAX_UPLOAD_BYTES} bytes"
+    )
+
+class BlobStore:
+    """
+    Files stored once per sha256 under a sharded path (ab/cd/abcd...), with a
+    reference count per hash in the blobs table
+    """
+
+    def __init__(self, root: str = BLOB_ROOT):
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, db, stream, max_bytes: int = MAX_UPLOAD_BYTES):
+        """
+        Copy a file object into the store in chunks, hashing as it goes, and
+        take a reference on the blob. Returns (sha256, path, size). The
+        reference is committed together with the caller's transaction.
+        """
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise _too_large()
+                    sha256.update(chunk)
+                    out.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = self.path_for(digest)
+            if os.path.exists(path):
+                # Same content is already stored
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._add_ref(db, digest, size)
+        return digest, path, size
+
+    def _add_ref(self, db, digest: str, size: int):
+        def increment():
+            return db.execute(
+                update(models.Blob)
+                .where(models.Blob.sha256 == digest)
+                .values(ref_count=models.Blob.ref_count + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+        if increment():
+            return
+        try:
+            with db.begin_nested():
+                db.add(models.Blob(sha256=digest, size=size, ref_count=1))
+        except IntegrityError:
+            # Another upload of the same file created the row first
+            increment()
+
+    def release(self, db, digest: str):
+        """
+        Drop a reference; the file is deleted with its last reference
+        """
+        _drop_ref(db, digest)
+        db.commit()
+        self.collect([digest])
+
+    def collect(self, digests):
+        """
+        Delete the rows and files of these blobs if nothing refers to them
+        """
+        with engine.begin() as connection:
+            unused = [
+                row.sha256 for row in connection.execute(
+                    select(models.Blob.sha256).where(models.Blob.sha256.in_(list(digests)), models.Blob.ref_count <= 0)
+                )
+            ]
+            if unused:
+                connection.execute(delete(models.Blob).where(
+                    models.Blob.sha256.in_(unused), models.Blob.ref_count <= 0
+                ))
+        for digest in unused:
+            path = self.path_for(digest)
+            if os.path.exists(path):
+                os.remove(path)
+
+def _drop_ref(connection, digest: str):
+    connection.execute(
+        update(models.Blob)
+        .where(models.Blob.sha256 == digest)
+        .values(ref_count=models.Blob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+# A resource holds a reference on its file's blob. Whatever deletes a
+# resource or points it at another file drops that reference in the same
+# transaction; files left unused are deleted once it commits.
+def _released(target, digest: str, connection):
+    _drop_ref(connection, digest)
+    object_session(target).info.setdefault("released_blobs", set()).add(digest)
+
+@event.listens_for(models.Resource, "after_delete")
+def _resource_deleted(mapper, connection, target):
+    if target.file_hash:
+        _released(target, target.file_hash, connection)
+
+@event.listens_for(models.Resource, "after_update")
+def _resource_updated(mapper, connection, target):
+    for digest in inspect(target).attrs.file_hash.history.deleted:
+        if digest:
+            _released(target, digest, connection)
+
+@event.listens_for(Session, "after_commit")
+def _collect_released(session):
+    digests = session.info.pop("released_blobs", None)
+    if digests:
+        blob_store.collect(digests)
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_released(session, transaction):
+    # Only the outermost transaction; collect() rechecks the counts, so
+    # digests left over from a rolled back savepoint do no harm
+    if transaction.parent is None:
+        session.info.pop("released_blobs", None)
+
+class _BodyTooLarge(Exception):
+    pass
+
+class UploadLimitMiddleware:
+    """
+    Reject uploads over the limit while they are received, before the form
+    parser spools them to disk: at once when Content-Length says so, and
+    otherwise as soon as the body read so far passes the limit, which is
+    how chunked uploads are caught.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES + CHUNK_SIZE):
+        # The default leaves room for the other fields of the form
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            {"detail": f"File is larger than {self.max_bytes} bytes"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    too_large = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if too_large:
+                # Whatever the app makes of a cut-off body, the answer is 413
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # FastAPI reports a body it failed to read as a 400 or lets the
+            # error through, depending on where it was reading
+            if not too_large:
+                raise
+        if too_large and not started:
+            await self._reject(scope, receive, send)
+
+# Global instance
+blob_store = BlobStore()
@@ -0,0 +1,259 @@
+# backend/app/bundles.py
+# Whole regional catalogues as single pre-compressed msgpack files
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime
+
+import msgpack
+from fastapi.staticfiles import StaticFiles
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+
+from . import models
+from .jobs import job_handler, enqueue, PRIORITY_BULK
+
+try:
+    import zstandard
+except ImportError:  # Optional, bundles are gzip-only without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_ROOT = os.getenv("BUNDLE_ROOT", "bundles")
+BUNDLE_URL_PREFIX = "/bundles"  # Where BUNDLE_ROOT is mounted
+BUNDLE_BATCH_SIZE = int(os.getenv("BUNDLE_BATCH_SIZE", "20"))  # Bundles built per job
+BUNDLE_FORMAT = 1  # Bump when the packed layout changes
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Packed per resource, in this order; country, grade_level and language are
+# the bundle's own. Ratings and view counts change too often for a bundle
+# and come from the change feed instead.
+BUNDLE_COLUMNS = [
+    models.Resource.id,
+    models.Resource.title,
+    models.Resource.description,
+    models.Resource.file_type,
+    models.Resource.subject,
+    models.Resource.tags,
+    models.Resource.file_name,
+    models.Resource.upload_date,
+]
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+
+def bundle_key(resource):
+    return (resource.country, resource.grade_level, resource.language or "en")
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "x"
+
+def _encodings():
+    return [encoding for encoding in ENCODINGS if encoding != "zstd" or zstandard is not None]
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=19).compress(body)
+    # mtime=0 keeps the file identical for identical contents
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, models.FileType):
+        return value.value
+    return value
+
+def pack_bundle(country: str, grade_level: str, language: str, rows) -> bytes:
+    """
+    A bundle's contents: the column names once, then one list of values per
+    resource, in id order
+    """
+    return msgpack.packb({
+        "format": BUNDLE_FORMAT,
+        "country": country,
+        "grade_level": grade_level,
+        "language": language,
+        "columns": [column.key for column in BUNDLE_COLUMNS],
+        "rows": [[_value(value) for value in row] for row in rows],
+    }, use_bin_type=True)
+
+def mark_stale(db, keys):
+    """
+    Queue a rebuild of the bundles of (country, grade_level, language) keys
+    whose approved resources changed. Commits.
+    """
+    keys = set(keys)
+    for country, grade_level, language in keys:
+        def bump():
+            return db.execute(
+                update(models.CatalogueBundle)
+                .where(
+                    models.CatalogueBundle.country == country,
+                    models.CatalogueBundle.grade_level == grade_level,
+                    models.CatalogueBundle.language == language
+                )
+                .values(generation=models.CatalogueBundle.generation + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+        if bump():
+            continue
+        try:
+            with db.begin_nested():
+                db.add(models.CatalogueBundle(country=country, grade_level=grade_level, language=language))
+        except IntegrityError:
+            # Created concurrently for another resource of the same key
+            bump()
+    db.commit()
+    if keys:
+        enqueue_bundle_build(db)
+
+def refresh(db):
+    """
+    Add a bundle for every key of the approved catalogue that has none, such
+    as the keys of resources older than bundles, and queue a build when any
+    bundle is stale. Safe to run on every startup.
+    """
+    language = func.coalesce(models.Resource.language, "en")
+    exists = select(models.CatalogueBundle.id).where(
+        models.CatalogueBundle.country == models.Resource.country,
+        models.CatalogueBundle.grade_level == models.Resource.grade_level,
+        models.CatalogueBundle.language == language
+    ).exists()
+    db.execute(insert(models.CatalogueBundle).from_select(
+        ["country", "grade_level", "language", "generation", "built_generation", "resource_count"],
+        select(
+            models.Resource.country, models.Resource.grade_level, language, literal(1), literal(0), literal(0)
+        ).where(models.Resource.is_approved == True, ~exists).distinct()
+    ))
+    db.commit()
+    if _stale(db).first() is not None:
+        enqueue_bundle_build(db)
+
+def _stale(db):
+    return db.query(models.CatalogueBundle).filter(
+        models.CatalogueBundle.built_generation < models.CatalogueBundle.generation
+    ).order_by(models.CatalogueBundle.id)
+
+def _write(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    os.replace(tmp_path, path)
+
+def _remove(file_name: str):
+    for suffix in ENCODINGS.values():
+        try:
+            os.remove(os.path.join(BUNDLE_ROOT, file_name + suffix))
+        except FileNotFoundError:
+            pass
+
+def build_bundle(db, bundle):
+    """
+    Pack a bundle from the current approved resources of its key. A new
+    version gets a new file name, so published files never change and can
+    be cached forever; the version before it is kept for clients still
+    downloading it.
+    """
+    generation = bundle.generation
+    rows = db.query(*BUNDLE_COLUMNS).filter(
+        models.Resource.is_approved == True,
+        models.Resource.country == bundle.country,
+        models.Resource.grade_level == bundle.grade_level,
+        func.coalesce(models.Resource.language, "en") == bundle.language
+    ).order_by(models.Resource.id).all()
+
+    body = pack_bundle(bundle.country, bundle.grade_level, bundle.language, rows)
+    version = hashlib.sha256(body).hexdigest()[:16]
+    file_name = f"{bundle.id}-{_slug(bundle.country)}-{_slug(bundle.grade_level)}-{_slug(bundle.language)}.{version}.msgpack"
+
+    if version != bundle.version:
+        os.makedirs(BUNDLE_ROOT, exist_ok=True)
+        for encoding in _encodings():
+            data = _compress(body, encoding)
+            _write(os.path.join(BUNDLE_ROOT, file_name + ENCODINGS[encoding]), data)
+            if encoding == "gzip":
+                bundle.size = len(data)
+        if bundle.previous_file_name and bundle.previous_file_name != file_name:
+            _remove(bundle.previous_file_name)
+        bundle.previous_file_name = bundle.file_name
+        bundle.file_name = file_name
+        bundle.version = version
+        bundle.resource_count = len(rows)
+    # Changes made while packing bumped generation past this and are built next
+    bundle.built_generation = generation
+    bundle.built_at = datetime.utcnow()
+    db.commit()
+    return bundle
+
+def enqueue_bundle_build(db):
+    """
+    Queue a build of the stale bundles. Bundles marked stale while one is
+    queued are picked up by it.
+    """
+    return enqueue(db, "build_bundles", {}, priority=PRIORITY_BULK, dedupe=True)
+
+@job_handler("build_bundles")
+def build_bundles(db, payload: dict):
+    built = [build_bundle(db, bundle).version for bundle in _stale(db).limit(BUNDLE_BATCH_SIZE).all()]
+    if built:
+        logger.info("Built %d catalogue bundles", len(built))
+    if _stale(db).first() is not None:
+        # The next batch, or changes that were deduplicated against this job
+        enqueue(db, "build_bundles", {}, priority=PRIORITY_BULK)
+    return {"built": len(built)}
+
+def bundle_url(bundle) -> str:
+    return f"{BUNDLE_URL_PREFIX}/{bundle.file_name}"
+
+def manifest(db):
+    """
+    The built bundles, for clients choosing what to prefetch
+    """
+    bundles = db.query(models.CatalogueBundle).filter(
+        models.CatalogueBundle.file_name.isnot(None)
+    ).order_by(
+        models.CatalogueBundle.country,
+        models.CatalogueBundle.grade_level,
+        models.CatalogueBundle.language
+    ).all()
+    return [
+        {
+            "country": bundle.country,
+            "grade_level": bundle.grade_level,
+            "language": bundle.language,
+            "version": bundle.version,
+            "url": bundle_url(bundle),
+            "size": bundle.size,
+            "resource_count": bundle.resource_count,
+            "built_at": bundle.built_at,
+        }
+        for bundle in bundles
+    ]
+
+class BundleFiles(StaticFiles):
+    """
+    Serves <name>.msgpack from the .zst or .gz file next to it, whichever
+    the client accepts, with immutable caching: a bundle's URL changes with
+    its contents.
+    """
+
+    async def get_response(self, path: str, scope):
+        encoding = "gzip"  # Every client can decode it
+        accepted = Headers(scope=scope).get("accept-encoding", "").lower()
+        if "zstd" in accepted and os.path.exists(os.path.join(self.directory, path + ENCODINGS["zstd"])):
+            encoding = "zstd"
+        response = await super().get_response(path + ENCODINGS[encoding], scope)
+        if response.status_code == 200:
+            response.headers["Content-Type"] = "application/msgpack"
+            response.headers["Content-Encoding"] = encoding
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,49 @@
+# backend/app/catalogue.py
+# Derived data kept in sync with the resource catalogue
+from fastapi import HTTPException
+
+from . import models, change_feed  # change_feed logs ORM changes for sync
+from . import bundles
+from .menu_cache import menu_cache
+from .query_cache import query_cache
+from .jobs import enqueue_pending_summaries
+
+# Listing orders as keyset_page keys; each has a matching index on
+# (is_approved, column, id)
+RESOURCE_SORTS = {
+    "rating": [(models.Resource.rating_average, True), (models.Resource.id, True)],
+    "popular": [(models.Resource.view_count, True), (models.Resource.id, True)],
+}
+DEFAULT_SORT_KEYS = [(models.Resource.id, False)]
+
+def resource_sort_keys(sort=None):
+    if sort is None:
+        return DEFAULT_SORT_KEYS
+    if sort not in RESOURCE_SORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sort {sort!r}, expected one of: {', '.join(RESOURCE_SORTS)}"
+        )
+    return RESOURCE_SORTS[sort]
+
+def resource_changed(db, resource):
+    """
+    Call after a resource was created, approved or edited and committed
+    """
+    menu_cache.resource_changed(db, resource)
+    query_cache.resource_changed(resource)
+    if resource.is_approved:
+        # Summaries are precomputed in batches, never on a read
+        enqueue_pending_summaries(db)
+        bundles.mark_stale(db, [bundles.bundle_key(resource)])
+
+def resources_imported(db, menus, bundle_keys):
+    """
+    Call after approved resources were inserted in bulk and committed, with
+    the (subject, grade_level) pairs they were filed under and their
+    (country, grade_level, language) bundle keys
+    """
+    menu_cache.menus_changed(db, menus)
+    query_cache.clear()
+    enqueue_pending_summaries(db)
+    bundles.mark_stale(db, bundle_keys)
@@ -0,0 +1,231 @@
+# backend/app/catalogue_import.py
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import time
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import func
+
+from . import models, schemas
+from .blob_store import blob_store
+from .change_feed import record_resources_since
+from . import catalogue
+from .database import SessionLocal
+from .jobs import job_handler, enqueue, PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_ERRORS = 1000  # Row errors kept on the import; the rest are only counted
+# A job imports for at most this long, then queues the rest as a new job
+# so it stays well inside the job lease
+IMPORT_SLICE_SECONDS = float(os.getenv("IMPORT_SLICE_SECONDS", "120"))
+
+IMPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+def detect_format(file_name: str):
+    return IMPORT_FORMATS.get(os.path.splitext(file_name or "")[1].lower())
+
+def read_rows(path: str, format: str):
+    """
+    Yield the records of a CSV or JSONL file one at a time. A record that
+    cannot be parsed is yielded as the exception instead.
+    """
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for record in reader:
+                # Empty cells are missing values, not empty strings
+                yield {
+                    key.strip(): value.strip() if value and value.strip() else None
+                    for key, value in record.items() if key
+                }
+        else:
+            for line in text:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    yield exc
+                    continue
+                yield record if isinstance(record, dict) else ValueError("Expected a JSON object")
+
+def _row_errors(exc) -> list:
+    if isinstance(exc, ValidationError):
+        return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+    return [str(exc)]
+
+def _validate(record, uploaded_by: int, approve: bool):
+    if isinstance(record, Exception):
+        raise record
+    resource = schemas.ResourceCreate(**{
+        key: value for key, value in record.items() if value is not None
+    })
+    return dict(resource.dict(), uploaded_by=uploaded_by, is_approved=approve, view_count=0)
+
+def run_import(db, catalogue_import, batch_size: int = IMPORT_BATCH_SIZE, max_seconds: float = None, progress=None):
+    """
+    Import from the checkpoint until the file ends or max_seconds passed.
+    Every batch is inserted with one executemany and committed together with
+    the checkpoint, so an interrupted import resumes after its last batch.
+    Returns True when the whole file was read.
+    """
+    started = time.monotonic()
+    errors = json.loads(catalogue_import.errors) if catalogue_import.errors else []
+    menus = set()
+    bundle_keys = set()
+    catalogue_import.status = models.ImportStatus.running
+    db.commit()
+
+    rows = read_rows(catalogue_import.file_path, catalogue_import.format)
+    row_number = catalogue_import.rows_read
+    # Committed rows are parsed again but not imported again
+    for _ in islice(rows, row_number):
+        pass
+
+    finished = False
+    while not finished:
+        batch = []
+        for record in islice(rows, batch_size):
+            row_number += 1
+            try:
+                batch.append(_validate(record, catalogue_import.uploaded_by, catalogue_import.approve))
+            except (ValidationError, ValueError, TypeError) as exc:
+                catalogue_import.rows_failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"row": row_number, "errors": _row_errors(exc)})
+        finished = row_number - catalogue_import.rows_read < batch_size
+
+        if batch:
+            last_id = db.query(func.max(models.Resource.id)).scalar() or 0
+            db.execute(models.Resource.__table__.insert(), batch)
+            record_resources_since(db, last_id, catalogue_import.uploaded_by)
+            if catalogue_import.approve:
+                menus.update((row["subject"], row["grade_level"]) for row in batch)
+                bundle_keys.update((row["country"], row["grade_level"], row["language"] or "en") for row in batch)
+        catalogue_import.rows_imported += len(batch)
+        catalogue_import.rows_read = row_number
+        catalogue_import.errors = json.dumps(errors)
+        if finished:
+            catalogue_import.status = models.ImportStatus.completed
+        db.commit()
+
+        if progress:
+            progress(catalogue_import)
+        if max_seconds is not None and time.monotonic() - started > max_seconds:
+            break
+
+    if menus:
+        catalogue.resources_imported(db, menus, bundle_keys)
+    if finished and catalogue_import.file_hash:
+        # The uploaded file is not needed once everything was read
+        blob_store.release(db, catalogue_import.file_hash)
+    return finished
+
+def import_status(catalogue_import) -> dict:
+    return {
+        "id": catalogue_import.id,
+        "file_name": catalogue_import.file_name,
+        "format": catalogue_import.format,
+        "status": catalogue_import.status,
+        "approve": catalogue_import.approve,
+        "rows_read": catalogue_import.rows_read,
+        "rows_imported": catalogue_import.rows_imported,
+        "rows_failed": catalogue_import.rows_failed,
+        "errors": json.loads(catalogue_import.errors) if catalogue_import.errors else [],
+        "created_at": catalogue_import.created_at,
+        "updated_at": catalogue_import.updated_at,
+    }
+
+def enqueue_import(db, catalogue_import, dedupe: bool = True):
+    # With dedupe, an import that is already queued or running is not started twice
+    return enqueue(db, "import_catalogue", {"import_id": catalogue_import.id}, priority=PRIORITY_BULK, dedupe=dedupe)
+
+@job_handler("import_catalogue")
+def import_catalogue(db, payload: dict):
+    catalogue_import = db.query(models.CatalogueImport).filter(
+        models.CatalogueImport.id == payload["import_id"]
+    ).first()
+    if catalogue_import is None:
+        raise ValueError(f"Import {payload['import_id']} not found")
+    if catalogue_import.status != models.ImportStatus.completed:
+        _run_import_slice(db, catalogue_import)
+    return {
+        "id": catalogue_import.id,
+        "status": catalogue_import.status,
+        "rows_read": catalogue_import.rows_read,
+        "rows_imported": catalogue_import.rows_imported,
+        "rows_failed": catalogue_import.rows_failed,
+    }
+
+def _run_import_slice(db, catalogue_import):
+    try:
+        finished = run_import(db, catalogue_import, max_seconds=IMPORT_SLICE_SECONDS)
+    except OSError:
+        db.rollback()
+        catalogue_import.status = models.ImportStatus.failed
+        db.commit()
+        raise
+    if not finished:
+        # Continue from the checkpoint in a fresh job; this one still counts
+        # as running, so it must not be deduplicated against
+        enqueue_import(db, catalogue_import, dedupe=False)
+
+def _print_progress(catalogue_import):
+    logger.info(
+        "Import %s: %s rows read, %s imported, %s failed",
+        catalogue_import.id, catalogue_import.rows_read,
+        catalogue_import.rows_imported, catalogue_import.rows_failed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Import resources from a CSV or JSONL file")
+    parser.add_argument("path", nargs="?", help="File to import")
+    parser.add_argument("--uploaded-by", type=int, help="Id of the user the resources are filed under")
+    parser.add_argument("--format", choices=sorted(set(IMPORT_FORMATS.values())))
+    parser.add_argument("--approve", action="store_true", help="Approve the imported resources")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--resume", type=int, metavar="IMPORT_ID", help="Continue an interrupted import")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        if args.resume:
+            catalogue_import = db.query(models.CatalogueImport).filter(
+                models.CatalogueImport.id == args.resume
+            ).first()
+            if catalogue_import is None:
+                parser.error(f"Import {args.resume} not found")
+        else:
+            if not args.path or not args.uploaded_by:
+                parser.error("path and --uploaded-by are required unless resuming")
+            format = args.format or detect_format(args.path)
+            if format is None:
+                parser.error("Unknown file type, pass --format")
+            catalogue_import = models.CatalogueImport(
+                file_path=os.path.abspath(args.path),
+                file_name=os.path.basename(args.path),
+                format=format,
+                approve=args.approve,
+                uploaded_by=args.uploaded_by
+            )
+            db.add(catalogue_import)
+            db.commit()
+            logger.info("Started import %s", catalogue_import.id)
+
+        run_import(db, catalogue_import, batch_size=args.batch_size, progress=_print_progress)
+        for error in json.loads(catalogue_import.errors or "[]"):
+            logger.warning("Row %s: %s", error["row"], "; ".join(error["errors"]))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# backend/app/change_feed.py
+# Catalogue changes in log order, for clients that sync incrementally
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event, func, insert, literal, select, update
+from sqlalchemy.orm import Session, object_session
+
+from . import models, schemas
+
+CHANGE_FEED_MAX_LIMIT = 1000
+LOG_COLUMNS = ["entity", "entity_id", "resource_id", "op", "changed_at", "txn"]
+
+# Log ids are taken when a change is flushed, not when it commits, so a
+# transaction can commit after one holding higher ids, and a cursor on ids
+# would skip it. Entries are logged with a token of their transaction
+# instead, and numbered (seq) in commit order as it commits: each committing
+# transaction locks the change_sequence row until its commit is done. The
+# feed only serves numbered entries, by seq.
+
+def _token(db) -> str:
+    """
+    The token marking the log entries of db's current transaction
+    """
+    return db.info.setdefault("change_log_txn", uuid.uuid4().hex)
+
+# entity name -> (model, column holding the resource id)
+ENTITIES = {
+    "resource": (models.Resource, models.Resource.id),
+    "translation": (models.Translation, models.Translation.resource_id),
+    "rating": (models.Rating, models.Rating.resource_id),
+}
+
+def _log_rows(db, entity: str, op: str = "upsert"):
+    """
+    A select of LOG_COLUMNS for every row of entity, to narrow with where()
+    """
+    model, resource_column = ENTITIES[entity]
+    # Labelled, or select() keeps Resource.id only once for resources and
+    # the insert is a column short
+    return select(
+        literal(entity),
+        model.id.label("entity_id"),
+        resource_column.label("resource_id"),
+        literal(op),
+        literal(datetime.utcnow()),
+        literal(_token(db))
+    )
+
+def _log(connection, db, entity: str, entity_id: int, resource_id: int, op: str = "upsert"):
+    connection.execute(insert(models.ChangeLog).values(
+        entity=entity, entity_id=entity_id, resource_id=resource_id, op=op, changed_at=datetime.utcnow(),
+        txn=_token(db)
+    ))
+
+def record_changes(db, entity: str, entity_ids, op: str = "upsert"):
+    """
+    Log changes made without the ORM (bulk statements), in the caller's
+    transaction. ORM inserts, updates and deletes are logged by the listeners
+    below.
+    """
+    model, _ = ENTITIES[entity]
+    entity_ids = list(entity_ids)
+    if not entity_ids:
+        return
+    db.execute(insert(models.ChangeLog).from_select(
+        LOG_COLUMNS, _log_rows(db, entity, op).where(model.id.in_(entity_ids))
+    ))
+
+def record_resources_since(db, last_id: int, uploaded_by: int):
+    """
+    Log resources inserted in bulk: the user's resources with an id above
+    last_id, the highest id before the insert
+    """
+    db.execute(insert(models.ChangeLog).from_select(
+        LOG_COLUMNS,
+        _log_rows(db, "resource").where(
+            models.Resource.id > last_id,
+            models.Resource.uploaded_by == uploaded_by
+        )
+    ))
+
+def backfill(db):
+    """
+    Log every row that was never logged, such as rows older than the log,
+    so a first sync from cursor 0 sees the whole catalogue. Safe to run on
+    every startup.
+    """
+    for entity, (model, _) in ENTITIES.items():
+        logged = select(models.ChangeLog.id).where(
+            models.ChangeLog.entity == entity,
+            models.ChangeLog.entity_id == model.id
+        ).exists()
+        db.execute(insert(models.ChangeLog).from_select(
+            LOG_COLUMNS, _log_rows(db, entity).where(~logged).order_by(model.id)
+        ))
+    db.commit()
+
+def _register(entity: str, model, resource_id):
+    @event.listens_for(model, "after_insert")
+    @event.listens_for(model, "after_update")
+    def _changed(mapper, connection, target):
+        _log(connection, object_session(target), entity, target.id, resource_id(target))
+
+    @event.listens_for(model, "after_delete")
+    def _deleted(mapper, connection, target):
+        _log(connection, object_session(target), entity, target.id, resource_id(target), op="delete")
+
+_register("resource", models.Resource, lambda target: target.id)
+_register("translation", models.Translation, lambda target: target.resource_id)
+_register("rating", models.Rating, lambda target: target.resource_id)
+
+@event.listens_for(Session, "before_commit")
+def _number_entries(db):
+    if "change_log_txn" not in db.info:
+        return
+    # The flush commit() is about to do may log more
+    db.flush()
+    txn = db.info.pop("change_log_txn")
+    first, last = db.execute(
+        select(func.min(models.ChangeLog.id), func.max(models.ChangeLog.id)).where(models.ChangeLog.txn == txn)
+    ).one()
+    if first is None:
+        return
+    span = last - first + 1
+    # Locks the row until this transaction has committed, so the next
+    # transaction to number its entries numbers them after these
+    taken = db.execute(
+        update(models.ChangeSequence)
+        .where(models.ChangeSequence.id == 1)
+        .values(last=models.ChangeSequence.last + span)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not taken:
+        db.execute(insert(models.ChangeSequence).values(
+            id=1, last=select(func.coalesce(func.max(models.ChangeLog.seq), 0) + span).scalar_subquery()
+        ))
+    end = db.execute(select(models.ChangeSequence.last).where(models.ChangeSequence.id == 1)).scalar()
+    # Ids keep their order and gaps within the transaction
+    db.execute(
+        update(models.ChangeLog)
+        .where(models.ChangeLog.txn == txn)
+        .values(seq=models.ChangeLog.id + (end - last), txn=None)
+        .execution_options(synchronize_session=False)
+    )
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_token(db, transaction):
+    if transaction.parent is None:
+        db.info.pop("change_log_txn", None)
+
+def changes_since(db, since: int = 0, limit: int = 500) -> dict:
+    """
+    The catalogue changes committed after cursor since, at most limit log entries,
+    compacted to the current state of each changed row. Rows that were
+    deleted, or whose resource is not approved, are returned as tombstones:
+    ids only.
+    """
+    entries = db.query(models.ChangeLog.seq, models.ChangeLog.entity, models.ChangeLog.entity_id).filter(
+        models.ChangeLog.seq > since
+    ).order_by(models.ChangeLog.seq).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changed = {entity: set() for entity in ENTITIES}
+    for entry in entries:
+        changed[entry.entity].add(entry.entity_id)
+
+    feed = {
+        "cursor": entries[-1].seq if entries else since,
+        "has_more": has_more,
+        "resources": [],
+        "translations": [],
+        "ratings": [],
+        "deleted": {"resources": [], "translations": [], "ratings": []},
+    }
+    # Whatever is logged is re-read as it is now; the log only says what to read
+    for entity, schema in (
+        ("resource", schemas.Resource),
+        ("translation", schemas.Translation),
+        ("rating", schemas.Rating),
+    ):
+        ids = changed[entity]
+        if not ids:
+            continue
+        model, resource_column = ENTITIES[entity]
+        query = db.query(model).filter(model.id.in_(list(ids)))
+        if model is not models.Resource:
+            query = query.join(models.Resource, models.Resource.id == resource_column)
+        rows = query.filter(models.Resource.is_approved == True).all()
+        present = {row.id for row in rows}
+        feed[f"{entity}s"] = [schema.from_orm(row) for row in rows]
+        feed["deleted"][f"{entity}s"] = sorted(ids - present)
+    return feed
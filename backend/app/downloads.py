@@ -0,0 +1,160 @@
+# backend/app/downloads.py
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
+
+import aiofiles
+from fastapi import HTTPException, Request
+from starlette.responses import FileResponse, Response
+
+from . import models
+
+# Set to the internal location nginx serves uploads from (e.g. /protected/)
+# to hand the transfer to the proxy, which sends the file with sendfile(2)
+DOWNLOAD_ACCEL_PREFIX = os.getenv("DOWNLOAD_ACCEL_PREFIX")
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _content_disposition(filename: str) -> str:
+    return f"attachment; filename*=utf-8''{quote(filename)}"
+
+def parse_range(header: Optional[str], size: int):
+    """
+    The (start, end) of a single-range Range header, end inclusive. None when
+    the whole file should be sent, "unsatisfiable" when no byte is in range.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        # Several ranges or another unit; serving the whole file is allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+def _if_range_matches(header: Optional[str], etag: str, mtime: float) -> bool:
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        # Only a strong validator can allow a partial response
+        return header == etag
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) >= int(mtime)
+    except (TypeError, ValueError):
+        return False
+
+class RangeFileResponse(FileResponse):
+    """
+    A FileResponse for bytes start to end of the file, end inclusive
+    """
+
+    def __init__(self, path: str, start: int, end: int, **kwargs):
+        self.start = start
+        self.end = end
+        super().__init__(path, status_code=206, **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async with aiofiles.open(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            remaining = self.end - self.start + 1
+            while remaining > 0:
+                chunk = await f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank under us; end the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def _accel_path(path: str) -> Optional[str]:
+    """
+    The location of path under DOWNLOAD_ACCEL_PREFIX, or None when path is
+    outside the working directory the proxy location maps to
+    """
+    relative = os.path.relpath(path)
+    if relative == ".." or relative.startswith(".." + os.sep):
+        return None
+    return DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + relative.replace(os.sep, "/")
+
+def file_download(request: Request, path: str, file_hash: Optional[str] = None, filename: Optional[str] = None):
+    """
+    Serve a stored file with a strong ETag and single-range Range/If-Range
+    support, so interrupted downloads resume where they stopped
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    size = stat.st_size
+    filename = filename or os.path.basename(path)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    # Blobs are content-addressed, so the hash is the strong validator
+    etag = f'"{file_hash}"' if file_hash else f'"{int(stat.st_mtime):x}-{size:x}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Content-Disposition": _content_disposition(filename),
+    }
+    if file_hash:
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if _if_range_matches(request.headers.get("if-range"), etag, stat.st_mtime):
+        byte_range = parse_range(request.headers.get("range"), size)
+    if byte_range == "unsatisfiable":
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    accel_path = _accel_path(path) if DOWNLOAD_ACCEL_PREFIX else None
+    if accel_path:
+        # The proxy answers Range itself, full and partial downloads alike
+        # go out with sendfile(2)
+        headers["X-Accel-Redirect"] = accel_path
+        return Response(media_type=media_type, headers=headers)
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return RangeFileResponse(path, start, end, media_type=media_type, headers=headers)
+
+def download_resource(request: Request, db, resource_id: int):
+    # Only the columns needed to find the file, not the whole resource
+    resource = db.query(
+        models.Resource.file_path,
+        models.Resource.file_hash,
+        models.Resource.file_name,
+    ).filter(
+        models.Resource.id == resource_id,
+        models.Resource.is_approved == True
+    ).first()
+    if resource is None or not resource.file_path:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return file_download(request, resource.file_path, resource.file_hash, resource.file_name)
@@ -0,0 +1,90 @@
+# backend/app/hashing.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+# bcrypt cost; hashes made with another cost are rehashed on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so one thread per core hashes in parallel
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "32"))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", "10"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+class HashingPool:
+    """
+    Dedicated, bounded executor for password hashing. When every worker is
+    busy and the queue is full, callers get a 503 straight away instead of
+    waiting behind a login storm.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, max_queue: int = HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @staticmethod
+    def _busy():
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise self._busy()
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn, *args):
+        """
+        Run fn on the pool and wait for it, from sync code. Waiting longer
+        than HASH_TIMEOUT means the pool is overloaded, which is a 503 too.
+        """
+        try:
+            return self.submit(fn, *args).result(timeout=HASH_TIMEOUT)
+        except FutureTimeoutError:
+            with self._lock:
+                self._rejected += 1
+            raise self._busy()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queued": max(self._in_flight - self.workers, 0),
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def _done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+# Global instance
+hashing_pool = HashingPool()
@@ -0,0 +1,133 @@
+# backend/app/http_cache.py
+import gzip
+import hashlib
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is used without it
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# GET endpoints whose JSON responses get validators and compression
+CONDITIONAL_GET_PATHS = ("/api/v1/resources", "/api/v1/bundles")
+# Files served with their own validators and Range support
+EXCLUDED_SUFFIXES = ("/download",)
+
+def weak_etag(body: bytes) -> str:
+    return 'W/"%s"' % hashlib.sha1(body).hexdigest()
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+def _qvalue(params) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                # An unreadable weight is not a yes
+                return 0.0
+    return 1.0
+
+def choose_encoding(accept_encoding: str):
+    # q=0, q=0.0 and q=0.000 all refuse an encoding
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        if _qvalue(params) > 0:
+            accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+class ConditionalGetMiddleware:
+    """
+    Weak ETags, If-None-Match and compression for catalogue GET responses.
+    The body is buffered to compute the ETag, so a client that already has
+    the current listing gets a bodiless 304, and everyone else gets it
+    gzip- or brotli-compressed.
+    """
+
+    def __init__(self, app, paths=CONDITIONAL_GET_PATHS, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.paths = paths
+        self.minimum_size = minimum_size
+
+    def _applies(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return False
+        path = scope["path"].rstrip("/")
+        return path.startswith(self.paths) and not path.endswith(EXCLUDED_SUFFIXES)
+
+    async def __call__(self, scope, receive, send):
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def buffer(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                response_headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or "etag" in response_headers or "content-encoding" in response_headers:
+                    # Errors and responses that handle caching themselves
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._send(start, b"".join(chunks), request_headers, send)
+
+        await self.app(scope, receive, buffer)
+
+    async def _send(self, start, body: bytes, request_headers, send):
+        headers = MutableHeaders(raw=list(start["headers"]))
+        etag = weak_etag(body)
+        headers["ETag"] = etag
+        # Clients may keep the response but must revalidate before using it
+        headers.setdefault("Cache-Control", "no-cache")
+        headers.add_vary_header("Accept-Encoding")
+
+        if etag_matches(request_headers.get("if-none-match", ""), etag):
+            for name in ("content-length", "content-type"):
+                if name in headers:
+                    del headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding and len(body) >= self.minimum_size:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": start["status"], "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,353 @@
+# backend/app/jobs.py
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+
+from . import models
+from .summarizer import summarize_batch
+from .tts_store import tts_store
+from .database import SessionLocal, engine
+from .translation_memo import translation_memo, save_translation
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, lower runs first
+PRIORITY_INTERACTIVE = 0  # A USSD user is waiting
+PRIORITY_DEFAULT = 5  # API requests
+PRIORITY_BULK = 9  # Backfills
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "5"))  # Doubles with every attempt
+JOB_LEASE = int(os.getenv("JOB_LEASE", "300"))  # Running jobs older than this are retried
+
+# Languages every summary is stored in, besides the resource's own
+SUMMARY_LANGUAGES = [language for language in os.getenv("SUMMARY_LANGUAGES", "en").split(",") if language]
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "50"))
+MAX_SUMMARY_SOURCE_CHARS = 100000  # Of a text file, to bound the summarizer's matrices
+
+# kind -> handler(db, payload) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+def job_handler(kind: str):
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return register
+
+def enqueue(db, kind: str, payload: dict, priority: int = PRIORITY_DEFAULT, max_attempts: int = 3, dedupe: bool = False):
+    """
+    Queue a job. With dedupe, a queued or running job of the same kind and
+    payload is returned instead of queueing another one.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    data = json.dumps(payload, sort_keys=True)
+    dedupe_key = None
+    if dedupe:
+        dedupe_key = hashlib.sha256(f"{kind}\0{data}".encode()).hexdigest()
+        existing = db.query(models.Job).filter(
+            models.Job.dedupe_key == dedupe_key,
+            models.Job.status.in_([models.JobStatus.queued, models.JobStatus.running])
+        ).first()
+        if existing:
+            return existing
+
+    job = models.Job(
+        kind=kind,
+        payload=data,
+        priority=priority,
+        status=models.JobStatus.queued,
+        dedupe_key=dedupe_key,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def claim_next(db, worker_id: str, max_priority: int = PRIORITY_BULK):
+    """
+    Take the next runnable job. A job is claimed by a conditional UPDATE, so
+    workers racing for the same row never both get it.
+    """
+    now = datetime.utcnow()
+    candidates = db.query(models.Job.id).filter(
+        models.Job.status == models.JobStatus.queued,
+        models.Job.priority <= max_priority,
+        models.Job.run_after <= now
+    ).order_by(models.Job.priority, models.Job.run_after, models.Job.id).limit(5).all()
+
+    for candidate in candidates:
+        claimed = db.execute(
+            update(models.Job)
+            .where(models.Job.id == candidate.id, models.Job.status == models.JobStatus.queued)
+            .values(
+                status=models.JobStatus.running,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=models.Job.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.query(models.Job).filter(models.Job.id == candidate.id).first()
+    return None
+
+def run_job(db, job):
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind {job.kind!r}")
+        result = handler(db, json.loads(job.payload))
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        job.error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts:
+            job.status = models.JobStatus.queued
+            job.run_after = datetime.utcnow() + timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = models.JobStatus.failed
+    else:
+        job.status = models.JobStatus.succeeded
+        job.result = json.dumps(result)
+        job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    db.commit()
+
+def requeue_stale(db):
+    """
+    Put jobs whose worker died back in the queue, or fail them when that was
+    their last attempt: a job that kills its worker would otherwise be
+    retried forever
+    """
+    expired = datetime.utcnow() - timedelta(seconds=JOB_LEASE)
+    stale = (models.Job.status == models.JobStatus.running, models.Job.locked_at < expired)
+    db.execute(
+        update(models.Job)
+        .where(*stale, models.Job.attempts >= models.Job.max_attempts)
+        .values(
+            status=models.JobStatus.failed,
+            error="Worker lost on the last attempt",
+            locked_by=None,
+            locked_at=None
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(models.Job)
+        .where(*stale)
+        .values(status=models.JobStatus.queued, locked_by=None, locked_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def work(worker_id: str, max_priority: int = PRIORITY_BULK, once: bool = False):
+    # Connections must not be shared with the parent process
+    engine.dispose()
+    db = SessionLocal()
+    last_reap = 0
+    try:
+        while True:
+            if time.monotonic() - last_reap > JOB_LEASE / 2:
+                requeue_stale(db)
+                last_reap = time.monotonic()
+            job = claim_next(db, worker_id, max_priority)
+            if job is not None:
+                run_job(db, job)
+            elif once:
+                return
+            else:
+                time.sleep(JOB_POLL_INTERVAL)
+    finally:
+        db.close()
+
+def run_workers(processes: int):
+    """
+    Start a pool of worker processes. With more than one process, the first
+    only takes interactive jobs so they never wait behind a backfill.
+    """
+    host = socket.gethostname()
+    workers = []
+    for number in range(processes):
+        max_priority = PRIORITY_INTERACTIVE if number == 0 and processes > 1 else PRIORITY_BULK
+        worker = multiprocessing.Process(
+            target=work,
+            args=(f"{host}:{os.getpid()}:{number}", max_priority),
+            name=f"job-worker-{number}",
+            daemon=True
+        )
+        worker.start()
+        workers.append(worker)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+def job_status(job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+def _get_resource(db, resource_id: int):
+    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
+    if resource is None:
+        raise ValueError(f"Resource {resource_id} not found")
+    return resource
+
+@job_handler("translate_resource")
+def translate_resource(db, payload: dict):
+    resource = _get_resource(db, payload["resource_id"])
+    language = payload["language"]
+    source_language = resource.language or "en"
+
+    translated_title = payload.get("translated_title")
+    if not translated_title:
+        translated_title = translation_memo.translate(db, resource.title, language, source_language)
+
+    translated_description = payload.get("translated_description")
+    if not translated_description and resource.description:
+        translated_description = translation_memo.translate(db, resource.description, language, source_language)
+
+    # For text resources, translate the content
+    translated_content = payload.get("translated_content")
+    if not translated_content and resource.file_type == models.FileType.text and resource.file_path:
+        try:
+            with open(resource.file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            content = None  # If the file is gone, keep the original content
+        if content:
+            translated_content = translation_memo.translate(db, content, language, source_language)
+
+    translation = save_translation(
+        db,
+        resource.id,
+        language,
+        translated_title=translated_title,
+        translated_description=translated_description,
+        translated_content=translated_content
+    )
+    return {"translation_id": translation.id}
+
+def _summary_source(resource) -> str:
+    parts = [resource.title, resource.description]
+    if resource.file_type == models.FileType.text and resource.file_path:
+        try:
+            with open(resource.file_path, 'r', encoding='utf-8') as f:
+                parts.append(f.read(MAX_SUMMARY_SOURCE_CHARS))
+        except OSError:
+            pass  # Summarize what the record says about it
+    return "\n\n".join(part for part in parts if part)
+
+def _store_summary(db, resource_id: int, language: str, summary_text: str):
+    summary = db.query(models.Summary).filter(
+        models.Summary.resource_id == resource_id,
+        models.Summary.language == language
+    ).first()
+    if summary is None:
+        summary = models.Summary(resource_id=resource_id, language=language)
+        db.add(summary)
+    summary.summary_text = summary_text
+
+def summarize_resources(db, resource_ids, languages=None):
+    """
+    Summarize resources in one batch and store each summary in the resource's
+    language and in every summary language, translated through the memo
+    """
+    resources = db.query(
+        models.Resource.id,
+        models.Resource.title,
+        models.Resource.description,
+        models.Resource.file_type,
+        models.Resource.file_path,
+        models.Resource.language,
+    ).filter(models.Resource.id.in_(list(resource_ids))).all()
+
+    summaries = summarize_batch([_summary_source(resource) for resource in resources])
+    stored = {}
+    for resource, summary_text in zip(resources, summaries):
+        source_language = resource.language or "en"
+        languages_stored = sorted({source_language, *(languages or SUMMARY_LANGUAGES)})
+        for language in languages_stored:
+            if language == source_language:
+                text = summary_text
+            else:
+                text = translation_memo.translate(db, summary_text, language, source_language)
+            _store_summary(db, resource.id, language, text)
+        stored[resource.id] = languages_stored
+    db.commit()
+    return stored
+
+def _unsummarized(db):
+    summarized = db.query(models.Summary.id).filter(
+        models.Summary.resource_id == models.Resource.id,
+        models.Summary.language == func.coalesce(models.Resource.language, "en")
+    ).exists()
+    return db.query(models.Resource.id).filter(models.Resource.is_approved == True, ~summarized)
+
+def enqueue_pending_summaries(db):
+    """
+    Queue a batch run over approved resources without a summary. Approvals
+    made while one is queued are picked up by it.
+    """
+    return enqueue(db, "summarize_pending", {}, priority=PRIORITY_BULK, dedupe=True)
+
+@job_handler("summarize_pending")
+def summarize_pending(db, payload: dict):
+    resource_ids = [row.id for row in _unsummarized(db).order_by(models.Resource.id).limit(SUMMARY_BATCH_SIZE)]
+    stored = summarize_resources(db, resource_ids) if resource_ids else {}
+    if _unsummarized(db).first() is not None:
+        # The next batch, or approvals that were deduplicated against this job
+        enqueue(db, "summarize_pending", {}, priority=PRIORITY_BULK)
+    return {"summarized": len(stored)}
+
+@job_handler("summarize_resource")
+def summarize_resource(db, payload: dict):
+    resource = _get_resource(db, payload["resource_id"])
+    language = payload.get("language", "en")
+    summarize_resources(db, [resource.id], languages=[language])
+    return {"resource_id": resource.id, "language": language}
+
+@job_handler("text_to_speech")
+def text_to_speech(db, payload: dict):
+    resource = _get_resource(db, payload["resource_id"])
+    language = payload.get("language", "en")
+    tts = tts_store.get_or_create(db, resource.id, resource.description or resource.title, language)
+    return {"tts_id": tts.id, "audio_path": tts.audio_path}
+
+# Modules with their own job handlers
+from . import catalogue_import, bundles
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    # Use app.jobs itself, where every handler is registered, rather than
+    # this copy of it running as __main__
+    from app import jobs
+    jobs.run_workers(args.processes)
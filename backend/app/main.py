@@ -1,17 +1,33 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import List, Optional
 import os
-import shutil
 
 from .database import SessionLocal, engine, Base
 from . import models, schemas
-from .auth import get_password_hash, verify_password, create_access_token, SECRET_KEY, ALGORITHM, oauth2_scheme, get_current_user
+from .catalogue import resource_changed, resource_sort_keys
+from .search import search_index, search_page, search_filter, rows_in_order
+from .pagination import keyset_page, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
+from .representations import parse_fields, check_expand, query_resources, resource_items, listing_response
+from .resource_detail import query_details, get_resource_detail, detail_items
+from .view_counter import view_counter
+from .blob_store import blob_store, UploadLimitMiddleware
+from .http_cache import ConditionalGetMiddleware
+from .tts_store import TTS_ROOT, TTS_URL_PREFIX
+from .query_cache import query_cache
+from .change_feed import changes_since, backfill, CHANGE_FEED_MAX_LIMIT
+from .downloads import download_resource
+from .bundles import BUNDLE_ROOT, BUNDLE_URL_PREFIX, BundleFiles, manifest, refresh
+from .auth import get_password_hash, authenticate_user, create_access_token, token_claims, SECRET_KEY, ALGORITHM, oauth2_scheme, get_current_user
+from .hashing import hashing_pool
+from .migrations import migrate
 
-# Create tables
+# Create tables, then add new columns and indexes to existing ones
 Base.metadata.create_all(bind=engine)
+migrate(engine)
 
 app = FastAPI(title="African LMS API", version="1.0.0")
 
@@ -22,7 +38,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Content-Range", "Accept-Ranges"],
 )
+app.add_middleware(UploadLimitMiddleware)
+# ETags, 304s and compression for the catalogue
+app.add_middleware(ConditionalGetMiddleware)
+
+# Synthesized audio, see tts_store
+os.makedirs(TTS_ROOT, exist_ok=True)
+app.mount(TTS_URL_PREFIX, StaticFiles(directory=TTS_ROOT), name="audio")
+# Packed regional catalogues, see bundles
+os.makedirs(BUNDLE_ROOT, exist_ok=True)
+app.mount(BUNDLE_URL_PREFIX, BundleFiles(directory=BUNDLE_ROOT), name="bundles")
 
 # Dependency
 def get_db():
@@ -64,12 +91,12 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 @app.post("/api/v1/users/login")
 def login(login_request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == login_request.username).first()
+    user = authenticate_user(db, login_request.username, login_request.password)
     
-    if not user or not verify_password(login_request.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=token_claims(user))
     
     return {
         "access_token": access_token, 
@@ -85,23 +112,72 @@ def login(login_request: schemas.LoginRequest, db: Session = Depends(get_db)):
 
 @app.get("/api/v1/resources/", response_model=List[schemas.Resource])
 def get_resources(
+    request: Request,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     subject: Optional[str] = None,
     grade_level: Optional[str] = None,
     country: Optional[str] = None,
+    language: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: bool = False,
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Resource).filter(models.Resource.is_approved == True)
-    
-    if subject:
-        query = query.filter(models.Resource.subject.ilike(f"%{subject}%"))
-    if grade_level:
-        query = query.filter(models.Resource.grade_level.ilike(f"%{grade_level}%"))
-    if country:
-        query = query.filter(models.Resource.country.ilike(f"%{country}%"))
-    
-    return query.offset(skip).limit(limit).all()
+    # ?fields=id,title,subject selects only those columns, ?expand=true adds
+    # related rows as /detail does; Accept: application/msgpack gets the
+    # listing packed instead of as JSON
+    fields = parse_fields(fields)
+    check_expand(fields, expand)
+    keys = resource_sort_keys(sort)
+
+    def query_listing():
+        return query_details(db) if expand else query_resources(db, fields, keys)
+
+    def items(rows):
+        return detail_items(rows) if expand else resource_items(rows, fields)
+
+    # Keyword search goes through the full-text index, best match first
+    # unless another sort is asked for
+    if q and not sort:
+        ids, next_cursor = search_page(
+            db, q, cursor=cursor, limit=limit, skip=skip,
+            subject=subject, grade_level=grade_level, country=country, language=language
+        )
+        return listing_response(request, items(rows_in_order(query_listing(), ids)), next_cursor)
+
+    def load():
+        query = query_listing().filter(models.Resource.is_approved == True)
+        
+        if q:
+            query = query.filter(search_filter(q))
+        if subject:
+            query = query.filter(models.Resource.subject.ilike(f"%{subject}%"))
+        if grade_level:
+            query = query.filter(models.Resource.grade_level.ilike(f"%{grade_level}%"))
+        if country:
+            query = query.filter(models.Resource.country.ilike(f"%{country}%"))
+        if language:
+            query = query.filter(models.Resource.language == language)
+        
+        rows, next_cursor = keyset_page(query, keys, cursor=cursor, limit=limit, skip=skip)
+        return items(rows), next_cursor
+
+    if q:
+        # Searches are too varied to be worth caching
+        resources, next_cursor = load()
+    else:
+        # Filters here match substrings, so cached pages are invalidated that way too
+        resources, next_cursor = query_cache.get_or_load(
+            "main_resources",
+            {"subject": subject, "grade_level": grade_level, "country": country, "language": language},
+            load,
+            contains=True,
+            skip=skip, limit=limit, cursor=cursor, sort=sort, fields=fields, expand=expand
+        )
+    return listing_response(request, resources, next_cursor)
 
 @app.post("/api/v1/resources/", response_model=schemas.Resource)
 def create_resource(
@@ -120,18 +196,16 @@ def create_resource(
     if current_user.role != "teacher" and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only teachers can upload resources")
     
-    # Save file
-    os.makedirs("uploads", exist_ok=True)
-    file_location = f"uploads/{file.filename}"
-    
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Save file, stored by content hash so identical uploads share one file
+    file_hash, file_location, _ = blob_store.put(db, file.file)
     
     # Create resource
     db_resource = models.Resource(
         title=title,
         description=description,
         file_path=file_location,
+        file_hash=file_hash,
+        file_name=file.filename,
         file_type=file_type,
         subject=subject,
         grade_level=grade_level,
@@ -145,12 +219,82 @@ def create_resource(
     db.add(db_resource)
     db.commit()
     db.refresh(db_resource)
+    resource_changed(db, db_resource)
     return db_resource
 
+@app.get("/api/v1/resources/{resource_id}/detail", response_model=schemas.ResourceDetail)
+def get_resource_details(resource_id: int, db: Session = Depends(get_db)):
+    # One call for a resource page instead of one per related list
+    resource = get_resource_detail(db, resource_id)
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+
+    view_counter.increment(resource.id)
+    result = schemas.ResourceDetail.from_orm(resource)
+    result.view_count += view_counter.pending_for(resource.id)
+    return result
+
+@app.get("/api/v1/resources/{resource_id}/download")
+def download(resource_id: int, request: Request, db: Session = Depends(get_db)):
+    return download_resource(request, db, resource_id)
+
+@app.get("/api/v1/resources/{resource_id}/summary", response_model=schemas.Summary)
+def read_summary(resource_id: int, language: str = "en", db: Session = Depends(get_db)):
+    summary = db.query(models.Summary).filter(
+        models.Summary.resource_id == resource_id,
+        models.Summary.language == language
+    ).first()
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Summary not available")
+    return summary
+
+@app.get("/api/v1/sync/changes", response_model=schemas.ChangeFeed)
+def read_changes(
+    since: int = 0,
+    limit: int = Query(500, ge=1, le=CHANGE_FEED_MAX_LIMIT),
+    db: Session = Depends(get_db)
+):
+    # Offline clients call again with the returned cursor while has_more is true
+    return changes_since(db, since, limit)
+
+@app.on_event("startup")
+def setup_search_index():
+    search_index.setup(engine)
+
+@app.on_event("startup")
+def backfill_change_log():
+    db = SessionLocal()
+    try:
+        backfill(db)
+    finally:
+        db.close()
+
+@app.get("/api/v1/bundles", response_model=List[schemas.CatalogueBundle])
+def read_bundles(db: Session = Depends(get_db)):
+    # The PWA prefetches a whole region's catalogue from one of these urls
+    return manifest(db)
+
+@app.on_event("startup")
+def refresh_catalogue_bundles():
+    db = SessionLocal()
+    try:
+        refresh(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def flush_view_counts():
+    view_counter.close()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to African LMS API"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "pending_view_counts": view_counter.pending(),
+        "password_hashing": hashing_pool.stats(),
+        "query_cache": query_cache.stats()
+    }
\ No newline at end of file
@@ -0,0 +1,157 @@
+# backend/app/menu_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import models
+from .ussd_menus import paginate, render_options_screen
+
+# Resources listed per subject/grade pair, spread over "98. More" pages
+MENU_MAX_RESOURCES = int(os.getenv("MENU_MAX_RESOURCES", "100"))
+# Menus are also reloaded after this many seconds, so approvals made by
+# other workers show up without a restart
+MENU_CACHE_MAX_AGE = int(os.getenv("MENU_CACHE_MAX_AGE", "300"))
+SEARCH_MENU_MAX_ENTRIES = 1000
+
+class ResourceMenu:
+    """
+    The rendered, paged "Select Resource" screens for a list of resources,
+    together with the options screen of every resource on it
+    """
+
+    __slots__ = ("pages", "resource_ids", "option_screens", "loaded_at")
+
+    def __init__(self, resource_ids, labels, titles, header="Select Resource:",
+                 empty_text="No resources found for this criteria.", options_screen="resource_options"):
+        self.resource_ids = list(resource_ids)
+        self.pages = paginate(header, labels, empty_text)
+        self.option_screens = [render_options_screen(title, options_screen) for title in titles]
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def for_browse(cls, resources):
+        titles = [r.title for r in resources]
+        return cls([r.id for r in resources], titles, titles)
+
+    @classmethod
+    def for_search(cls, resources):
+        return cls(
+            [r.id for r in resources],
+            [f"{r.title} ({r.subject})" for r in resources],
+            [r.title for r in resources],
+            header="Search Results:",
+            empty_text="No resources found.",
+            options_screen="search_result_options",
+        )
+
+    def page_text(self, page: int) -> str:
+        return self.pages[min(page, len(self.pages) - 1)][0]
+
+    def has_next(self, page: int) -> bool:
+        return page + 1 < len(self.pages)
+
+    def resource_at(self, page: int, choice: str):
+        """
+        Map a choice on a page to its index in the menu, or None
+        """
+        try:
+            offset = int(choice) - 1
+        except ValueError:
+            return None
+        _, start, count = self.pages[min(page, len(self.pages) - 1)]
+        if 0 <= offset < count:
+            return start + offset
+        return None
+
+    @property
+    def empty(self) -> bool:
+        return not self.resource_ids
+
+class MenuPageCache:
+    def __init__(self, max_age: int = MENU_CACHE_MAX_AGE):
+        self.max_age = max_age
+        self._menus = {}  # (subject, grade_level) -> ResourceMenu
+        self._search_menus = OrderedDict()  # normalized term -> ResourceMenu
+        self._lock = threading.Lock()
+
+    def _fresh(self, menu):
+        return menu is not None and time.monotonic() - menu.loaded_at <= self.max_age
+
+    def get(self, subject: str, grade_level: str):
+        menu = self._menus.get((subject, grade_level))
+        return menu if self._fresh(menu) else None
+
+    def get_or_load(self, db, subject: str, grade_level: str) -> ResourceMenu:
+        menu = self.get(subject, grade_level)
+        if menu is None:
+            menu = self.load(db, subject, grade_level)
+        return menu
+
+    def load(self, db, subject: str, grade_level: str) -> ResourceMenu:
+        resources = db.query(models.Resource.id, models.Resource.title).filter(
+            models.Resource.subject == subject,
+            models.Resource.grade_level == grade_level,
+            models.Resource.is_approved == True
+        ).order_by(models.Resource.id).limit(MENU_MAX_RESOURCES).all()
+
+        menu = ResourceMenu.for_browse(resources)
+        with self._lock:
+            self._menus[(subject, grade_level)] = menu
+        return menu
+
+    def warm(self, db):
+        """
+        Build the menus for every subject/grade pair with one query
+        """
+        grouped = {}
+        rows = db.query(
+            models.Resource.id, models.Resource.title, models.Resource.subject, models.Resource.grade_level
+        ).filter(models.Resource.is_approved == True).order_by(models.Resource.id)
+        for row in rows:
+            menu_rows = grouped.setdefault((row.subject, row.grade_level), [])
+            if len(menu_rows) < MENU_MAX_RESOURCES:
+                menu_rows.append(row)
+
+        menus = {key: ResourceMenu.for_browse(menu_rows) for key, menu_rows in grouped.items()}
+        with self._lock:
+            self._menus = menus
+
+    def search(self, db, term: str, search) -> ResourceMenu:
+        """
+        Menu of search results for a term; search(db, term) returns the resources
+        """
+        key = " ".join(term.lower().split())
+        menu = self._search_menus.get(key)
+        if self._fresh(menu):
+            return menu
+
+        menu = ResourceMenu.for_search(search(db, term))
+        with self._lock:
+            self._search_menus[key] = menu
+            self._search_menus.move_to_end(key)
+            while len(self._search_menus) > SEARCH_MENU_MAX_ENTRIES:
+                self._search_menus.popitem(last=False)
+        return menu
+
+    def resource_changed(self, db, resource):
+        """
+        Rebuild only the menu the resource belongs to, after it was created or approved
+        """
+        if resource.is_approved or (resource.subject, resource.grade_level) in self._menus:
+            self.load(db, resource.subject, resource.grade_level)
+        if resource.is_approved:
+            with self._lock:
+                self._search_menus.clear()
+
+    def menus_changed(self, db, menus):
+        """
+        Rebuild the given (subject, grade_level) menus after a bulk change
+        """
+        for subject, grade_level in menus:
+            self.load(db, subject, grade_level)
+        with self._lock:
+            self._search_menus.clear()
+
+# Global instance
+menu_cache = MenuPageCache()
@@ -0,0 +1,201 @@
+# backend/app/migrations.py
+# Versioned schema changes for databases created before the models changed.
+# New tables come from Base.metadata.create_all; migrations add what it
+# cannot: columns, keys and indexes on tables that already exist.
+import argparse
+import logging
+from datetime import datetime
+
+from sqlalchemy import func, inspect, insert, select, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .rating_stats import rebuild_rating_stats
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK = "african_lms_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 300  # Seconds another process may spend migrating
+
+# (version, name, fn(connection)), applied in version order
+MIGRATIONS = []
+
+def migration(version: int, name: str):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+def _columns(connection, table: str):
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+def _indexes(connection, table: str):
+    inspector = inspect(connection)
+    # SQLite reports unique constraints apart from indexes
+    names = {index["name"] for index in inspector.get_indexes(table)}
+    return names | {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+
+# Every step checks before it changes anything, so a migration that stopped
+# halfway (MySQL commits each DDL statement) can simply run again
+
+def add_column(connection, table: str, name: str, definition: str):
+    if name not in _columns(connection, table):
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+
+def create_index(connection, table: str, name: str, columns, unique: bool = False):
+    if name not in _indexes(connection, table):
+        connection.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(columns)})"
+        ))
+
+def drop_duplicates(connection, table: str, columns):
+    """
+    Keep only the newest row of each group of rows a unique key would reject
+    """
+    # The extra derived table lets MySQL delete from the table it reads
+    connection.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN ("
+        f"SELECT id FROM (SELECT MAX(id) AS id FROM {table} GROUP BY {', '.join(columns)}) AS newest)"
+    ))
+
+def add_unique_key(connection, table: str, name: str, columns):
+    if name not in _indexes(connection, table):
+        drop_duplicates(connection, table, columns)
+        create_index(connection, table, name, columns, unique=True)
+
+@migration(1, "translation_unique_key")
+def translation_unique_key(connection):
+    # Translations are upserted per resource and language
+    add_unique_key(connection, "translations", "uq_translations_resource_language", ["resource_id", "language"])
+
+@migration(2, "blob_store_columns")
+def blob_store_columns(connection):
+    add_column(connection, "resources", "file_hash", "VARCHAR(64)")
+    add_column(connection, "resources", "file_name", "VARCHAR(255)")
+    create_index(connection, "resources", "ix_resources_file_hash", ["file_hash"])
+
+@migration(3, "rating_aggregates")
+def rating_aggregates(connection):
+    for name in ["rating_count", "rating_sum", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5"]:
+        add_column(connection, "resources", name, "INTEGER NOT NULL DEFAULT 0")
+    add_column(connection, "resources", "rating_average", "DOUBLE PRECISION NOT NULL DEFAULT 0")
+    create_index(connection, "resources", "ix_resources_rating", ["is_approved", "rating_average", "id"])
+    create_index(connection, "resources", "ix_resources_popular", ["is_approved", "view_count", "id"])
+    rebuild_rating_stats(Session(bind=connection))
+
+@migration(4, "rating_unique_key")
+def rating_unique_key(connection):
+    add_unique_key(connection, "ratings", "uq_ratings_user_resource", ["user_id", "resource_id"])
+    # Without the duplicates the aggregates count fewer ratings
+    rebuild_rating_stats(Session(bind=connection))
+
+@migration(5, "summary_unique_key")
+def summary_unique_key(connection):
+    add_unique_key(connection, "summaries", "uq_summaries_resource_language", ["resource_id", "language"])
+
+@migration(6, "tts_store_columns")
+def tts_store_columns(connection):
+    add_column(connection, "text_to_speech", "digest", "VARCHAR(64)")
+    add_column(connection, "text_to_speech", "size", "INTEGER")
+    add_column(connection, "text_to_speech", "last_accessed", "DATETIME")
+    create_index(connection, "text_to_speech", "ix_text_to_speech_digest", ["digest"])
+    add_unique_key(connection, "text_to_speech", "uq_text_to_speech_resource_language", ["resource_id", "language"])
+
+@migration(7, "hot_path_indexes")
+def hot_path_indexes(connection):
+    for table, name, columns in [
+        # Listing filters; id last for keyset pagination
+        ("resources", "ix_resources_approved", ["is_approved", "id"]),
+        # Covers the USSD menu query, which reads only id and title
+        ("resources", "ix_resources_menu", ["is_approved", "subject", "grade_level", "id", "title"]),
+        ("resources", "ix_resources_region", ["is_approved", "country", "grade_level", "language", "id"]),
+        ("resources", "ix_resources_grade", ["is_approved", "grade_level", "id"]),
+        ("resources", "ix_resources_language", ["is_approved", "language", "id"]),
+        ("resources", "ix_resources_uploader", ["uploaded_by", "id"]),
+        ("ratings", "ix_ratings_resource", ["resource_id", "id"]),
+        ("ussd_sessions", "ix_ussd_sessions_session_id", ["session_id"]),
+        ("users", "ix_users_phone_number", ["phone_number"]),
+    ]:
+        create_index(connection, table, name, columns)
+
+@migration(8, "ussd_session_state")
+def ussd_session_state(connection):
+    add_column(connection, "ussd_sessions", "search_term", "VARCHAR(160)")
+    add_column(connection, "ussd_sessions", "page", "INTEGER NOT NULL DEFAULT 0")
+    add_column(connection, "ussd_sessions", "target_language", "VARCHAR(10)")
+
+@migration(9, "change_log_commit_order")
+def change_log_commit_order(connection):
+    add_column(connection, "change_log", "seq", "BIGINT")
+    add_column(connection, "change_log", "txn", "VARCHAR(32)")
+    # Entries logged so far keep their ids as positions, so the cursors
+    # clients hold stay valid
+    connection.execute(text("UPDATE change_log SET seq = id WHERE seq IS NULL AND txn IS NULL"))
+    create_index(connection, "change_log", "ix_change_log_seq", ["seq"], unique=True)
+    create_index(connection, "change_log", "ix_change_log_txn", ["txn"])
+    if connection.execute(select(models.ChangeSequence.id)).first() is None:
+        connection.execute(insert(models.ChangeSequence).values(
+            id=1, last=select(func.coalesce(func.max(models.ChangeLog.seq), 0)).scalar_subquery()
+        ))
+
+def _lock(connection) -> bool:
+    # Workers starting together must not migrate at the same time. SQLite
+    # serializes writers on its own.
+    if connection.dialect.name != "mysql":
+        return True
+    return bool(connection.execute(
+        text("SELECT GET_LOCK(:name, :timeout)"), {"name": MIGRATION_LOCK, "timeout": MIGRATION_LOCK_TIMEOUT}
+    ).scalar())
+
+def _unlock(connection):
+    if connection.dialect.name == "mysql":
+        connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK})
+
+def applied_versions(connection):
+    return {row.version for row in connection.execute(select(models.SchemaMigration.version))}
+
+def migrate(engine):
+    """
+    Apply the pending migrations in version order and record each in
+    schema_migrations. Returns the versions applied. Run after create_all,
+    which creates schema_migrations itself.
+    """
+    applied = []
+    with engine.connect() as connection:
+        if not _lock(connection):
+            raise RuntimeError("Timed out waiting for another process to finish migrating")
+        try:
+            done = applied_versions(connection)
+            for version, name, fn in sorted(MIGRATIONS, key=lambda item: item[0]):
+                if version in done:
+                    continue
+                logger.info("Applying migration %s %s", version, name)
+                with connection.begin():
+                    fn(connection)
+                    connection.execute(insert(models.SchemaMigration).values(
+                        version=version, name=name, applied_at=datetime.utcnow()
+                    ))
+                applied.append(version)
+        finally:
+            _unlock(connection)
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--list", action="store_true", help="Show applied and pending migrations only")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from .database import engine, Base
+    Base.metadata.create_all(bind=engine)
+    if args.list:
+        with engine.connect() as connection:
+            done = applied_versions(connection)
+        for version, name, _ in sorted(MIGRATIONS, key=lambda item: item[0]):
+            print(f"{version:>4} {name:<24} {'applied' if version in done else 'pending'}")
+        return
+    applied = migrate(engine)
+    print(f"Applied {len(applied)} migrations" if applied else "Schema is up to date")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # backend/app/models.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, Enum, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, Boolean, Enum, ForeignKey, TIMESTAMP, DateTime, UniqueConstraint, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from .database import Base
 import enum
 
@@ -25,7 +25,7 @@ class User(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.student)
-    phone_number = Column(String(20))
+    phone_number = Column(String(20), index=True)  # USSD users are found by phone
     country = Column(String(50))
     language_preference = Column(String(10), default="en")
     is_teacher_verified = Column(Boolean, default=False)
@@ -42,6 +42,10 @@ class Resource(Base):
     title = Column(String(255), nullable=False)
     description = Column(Text)
     file_path = Column(String(255))
+    # sha256 of the stored blob. The old value is loaded when it is replaced,
+    # so the blob it referenced can be released (see blob_store)
+    file_hash = column_property(Column(String(64), index=True), active_history=True)
+    file_name = Column(String(255))  # Name the file was uploaded with
     file_type = Column(Enum(FileType), nullable=False)
     subject = Column(String(100), nullable=False)
     grade_level = Column(String(50), nullable=False)
@@ -52,6 +56,29 @@ class Resource(Base):
     upload_date = Column(TIMESTAMP, server_default=func.now())
     is_approved = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
+    # Rating aggregates, kept up to date by rating_stats.record_rating
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_average = Column(Float(53), nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # Listing orders, see catalogue.RESOURCE_SORTS
+        Index("ix_resources_rating", "is_approved", "rating_average", "id"),
+        Index("ix_resources_popular", "is_approved", "view_count", "id"),
+        # Listing filters, each ending in id for keyset pagination; see
+        # migrations and check_queries.py
+        Index("ix_resources_approved", "is_approved", "id"),
+        Index("ix_resources_menu", "is_approved", "subject", "grade_level", "id", "title"),  # Covers USSD menus
+        Index("ix_resources_region", "is_approved", "country", "grade_level", "language", "id"),
+        Index("ix_resources_grade", "is_approved", "grade_level", "id"),
+        Index("ix_resources_language", "is_approved", "language", "id"),
+        Index("ix_resources_uploader", "uploaded_by", "id"),
+    )
     
     uploader = relationship("User", back_populates="resources")
     translations = relationship("Translation", back_populates="resource")
@@ -59,8 +86,23 @@ class Resource(Base):
     tts = relationship("TextToSpeech", back_populates="resource")
     summaries = relationship("Summary", back_populates="resource")
 
+    @property
+    def rating_histogram(self):
+        return [self.rating_1 or 0, self.rating_2 or 0, self.rating_3 or 0, self.rating_4 or 0, self.rating_5 or 0]
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
 class Translation(Base):
     __tablename__ = "translations"
+    __table_args__ = (
+        UniqueConstraint("resource_id", "language", name="uq_translations_resource_language"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     resource_id = Column(Integer, ForeignKey("resources.id"), nullable=False)
@@ -72,6 +114,18 @@ class Translation(Base):
     
     resource = relationship("Resource", back_populates="translations")
 
+class TranslationMemo(Base):
+    __tablename__ = "translation_memo"
+    __table_args__ = (
+        UniqueConstraint("source_digest", "target_language", name="uq_translation_memo_digest_language"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_digest = Column(String(64), nullable=False)  # sha256 of source language and text
+    target_language = Column(String(10), nullable=False)
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
 class Rating(Base):
     __tablename__ = "ratings"
 
@@ -81,6 +135,12 @@ class Rating(Base):
     rating = Column(Integer)
     review = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        # One rating per user and resource; bulk sync upserts on it
+        UniqueConstraint("user_id", "resource_id", name="uq_ratings_user_resource"),
+        Index("ix_ratings_resource", "resource_id", "id"),
+    )
     
     resource = relationship("Resource", back_populates="ratings")
     user = relationship("User", back_populates="ratings")
@@ -91,8 +151,15 @@ class TextToSpeech(Base):
     id = Column(Integer, primary_key=True, index=True)
     resource_id = Column(Integer, ForeignKey("resources.id"), nullable=False)
     language = Column(String(10), nullable=False)
-    audio_path = Column(String(255), nullable=False)
+    audio_path = Column(String(255), nullable=False)  # URL under the /audio mount
+    digest = Column(String(64), index=True)  # sha256 of language and text, names the file
+    size = Column(Integer)
+    last_accessed = Column(DateTime)  # For LRU eviction
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("resource_id", "language", name="uq_text_to_speech_resource_language"),
+    )
     
     resource = relationship("Resource", back_populates="tts")
 
@@ -104,6 +171,10 @@ class Summary(Base):
     language = Column(String(10), nullable=False)
     summary_text = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("resource_id", "language", name="uq_summaries_resource_language"),
+    )
     
     resource = relationship("Resource", back_populates="summaries")
 
@@ -112,10 +183,123 @@ class USSDSession(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     phone_number = Column(String(20), nullable=False)
-    session_id = Column(String(100), nullable=False)
+    session_id = Column(String(100), nullable=False, index=True)
     menu_level = Column(String(50), default="main")
     selected_subject = Column(String(100))
     selected_grade = Column(String(50))
     selected_resource_id = Column(Integer)
+    # Needed to carry on from the search and list screens after a recovery
+    search_term = Column(String(160))
+    page = Column(Integer, nullable=False, default=0, server_default="0")
+    target_language = Column(String(10))
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the next runnable job in priority order
+        Index("ix_jobs_claim", "status", "priority", "run_after", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    priority = Column(Integer, nullable=False, default=5)  # Lower runs first
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.queued)
+    dedupe_key = Column(String(64), index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False)
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime)
+    result = Column(Text)  # JSON
+    error = Column(Text)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class ImportStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class CatalogueImport(Base):
+    __tablename__ = "catalogue_imports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_path = Column(String(255), nullable=False)
+    file_hash = Column(String(64), index=True)
+    file_name = Column(String(255))
+    format = Column(String(10), nullable=False)  # csv or jsonl
+    status = Column(Enum(ImportStatus), nullable=False, default=ImportStatus.queued)
+    approve = Column(Boolean, nullable=False, default=False)  # Imported resources are approved
+    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Checkpoint: rows before rows_read are committed and skipped on resume
+    rows_read = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text)  # JSON list of {row, errors}, the first IMPORT_MAX_ERRORS
     created_at = Column(TIMESTAMP, server_default=func.now())
-    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_entity", "entity", "entity_id"),
+        Index("ix_change_log_seq", "seq", unique=True),
+        Index("ix_change_log_txn", "txn"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    entity = Column(String(20), nullable=False)  # resource, translation or rating
+    entity_id = Column(Integer, nullable=False)
+    resource_id = Column(Integer)
+    op = Column(String(10), nullable=False)  # upsert or delete
+    changed_at = Column(DateTime, nullable=False)
+    # The sync cursor: set in commit order as the transaction that logged the
+    # entry commits, so it only grows for readers (see change_feed)
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"))
+    txn = Column(String(32))  # Token of the logging transaction until then
+
+class ChangeSequence(Base):
+    __tablename__ = "change_sequence"
+
+    # A single row; committing transactions lock it in turn to number their entries
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    last = Column(BigInteger, nullable=False, default=0)
+
+class CatalogueBundle(Base):
+    __tablename__ = "catalogue_bundles"
+    __table_args__ = (
+        UniqueConstraint("country", "grade_level", "language", name="uq_catalogue_bundles_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    country = Column(String(50), nullable=False)
+    grade_level = Column(String(50), nullable=False)
+    language = Column(String(10), nullable=False)
+    # Bumped by every change to the bundle's resources; the bundle is stale
+    # while built_generation is behind it
+    generation = Column(Integer, nullable=False, default=1)
+    built_generation = Column(Integer, nullable=False, default=0)
+    version = Column(String(16))  # Digest of the packed contents
+    file_name = Column(String(255))
+    previous_file_name = Column(String(255))  # Kept for clients mid-download
+    size = Column(Integer)
+    resource_count = Column(Integer, nullable=False, default=0)
+    built_at = Column(DateTime)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    # See migrations.MIGRATIONS
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, nullable=False)
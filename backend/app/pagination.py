@@ -0,0 +1,60 @@
+# backend/app/pagination.py
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Largest page a listing returns, which also bounds what query_cache holds
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(values) -> str:
+    data = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def _after(keys, values):
+    # Row-value comparison (a, b) > (x, y), spelled out so every database
+    # can use an index on the sort columns
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[keys[j][0] == values[j] for j in range(i)], beyond))
+    return or_(*clauses)
+
+def keyset_page(query, keys, cursor=None, limit: int = 100, skip: int = 0):
+    """
+    Fetch one page of query ordered by keys, a list of (column, descending)
+    ending in a unique column. Returns (rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys))))
+    elif skip:
+        # Offsets are still accepted for existing clients
+        query = query.offset(skip)
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column, _ in keys])
+    return rows, next_cursor
+
+def set_next_cursor(response, next_cursor):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,76 @@
+# backend/app/principals.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+
+from . import models
+
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+
+class Principal:
+    """
+    The authenticated user as seen by the endpoints: the fields they check,
+    without a database session attached
+    """
+
+    __slots__ = ("id", "username", "email", "role", "is_teacher_verified")
+
+    def __init__(self, id: int, username: str, email: str, role, is_teacher_verified: bool):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = models.UserRole(role)
+        self.is_teacher_verified = bool(is_teacher_verified)
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.role, user.is_teacher_verified)
+
+class PrincipalCache:
+    """
+    Active principals by user id, for a short TTL. Entries are dropped as
+    soon as a user's role or verification changes.
+    """
+
+    def __init__(self, ttl: int = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (expires_at, Principal)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+# Global instance
+principal_cache = PrincipalCache()
+
+@event.listens_for(models.User, "after_update")
+def _invalidate_changed_principal(mapper, connection, target):
+    # Changes made through the ORM; other workers pick them up within the TTL
+    state = inspect(target)
+    for field in ("role", "is_teacher_verified", "username", "email"):
+        if state.attrs[field].history.has_changes():
+            principal_cache.invalidate(target.id)
+            return
+
+@event.listens_for(models.User, "after_delete")
+def _invalidate_deleted_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,136 @@
+# backend/app/query_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+# Bounds how stale view counts, ratings and other workers' changes can be
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+
+ANY = ("*", None)  # Tag of entries a change to any resource may affect
+
+def _normalize(value):
+    # For tags and matching only: invalidating too much is harmless
+    return value.strip().casefold() if isinstance(value, str) else value
+
+class QueryCache:
+    """
+    Listing results by filters and page, bounded by entry count and TTL;
+    listings cap their page size (pagination.MAX_PAGE_SIZE), so entries are
+    bounded too. Entries are tagged with their exact-match filter values, so
+    a changed resource only drops the listings it could appear in.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl: float = QUERY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, value, filters, contains)
+        self._entries = OrderedDict()
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, name: str, filters: dict, contains: bool = False, **page):
+        # Exact filters are compared as the database compares them, which may
+        # be case-sensitive; contains filters are ilike, which is not
+        filters = tuple(sorted(
+            (field, value.casefold() if contains and isinstance(value, str) else value)
+            for field, value in filters.items() if value
+        ))
+        return (name, filters, tuple(sorted(page.items())))
+
+    def get_or_load(self, name: str, filters: dict, load, contains: bool = False, **page):
+        """
+        The cached result for filters and page, or load() stored under them.
+        With contains, filters match resources whose field contains the value
+        (ilike '%value%') rather than equals it.
+        """
+        key = self.key(name, filters, contains, **page)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            with self._lock:
+                self.hits += 1
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        value = load()
+        self._put(key, value, contains)
+        return value
+
+    def _put(self, key, value, contains: bool):
+        filters = {field: _normalize(value) for field, value in key[1]}
+        tags = [ANY] if contains or not filters else list(filters.items())
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, filters, contains)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        filters, contains = entry[2], entry[3]
+        for tag in [ANY] if contains or not filters else filters.items():
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    @staticmethod
+    def _matches(entry, resource) -> bool:
+        filters, contains = entry[2], entry[3]
+        for field, value in filters.items():
+            actual = _normalize(getattr(resource, field, None))
+            if actual is None:
+                return False
+            if contains and value not in actual:
+                return False
+            if not contains and value != actual:
+                return False
+        return True
+
+    def resource_changed(self, resource):
+        """
+        Drop the listings a created, approved or edited resource may appear in
+        """
+        with self._lock:
+            candidates = set(self._tags.get(ANY, ()))
+            for field in ("subject", "grade_level", "country", "language"):
+                candidates |= self._tags.get((field, _normalize(getattr(resource, field, None))), set())
+            for key in candidates:
+                entry = self._entries.get(key)
+                if entry is not None and self._matches(entry, resource):
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Global instance
+query_cache = QueryCache()
@@ -0,0 +1,59 @@
+# backend/app/query_counter.py
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries(engine):
+    """
+    Record the statements engine sends to the database inside the block
+    """
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+# Tables that stay a few rows long by design, so reading them in full is fine
+SMALL_TABLES = ("schema_migrations",)
+
+def full_scans(connection, statement, small_tables=SMALL_TABLES):
+    """
+    The tables EXPLAIN says statement reads in full, rows or a whole index,
+    other than small_tables. A scan counts whether or not an index could
+    have served it: a usable index the optimizer passes over is the
+    regression this is meant to catch.
+    """
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        scans = []
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+            detail = row[-1]
+            match = SQLITE_SCAN.match(detail)
+            # SCAN ... USING (COVERING) INDEX still reads every entry of the
+            # index; only SEARCH seeks into it
+            if match and match.group(1) != "CONSTANT":
+                scans.append(match.group(1))
+    else:
+        # type index is a full index scan, as SCAN ... USING INDEX above
+        scans = [
+            row.table
+            for row in connection.exec_driver_sql(f"EXPLAIN {sql}")
+            if row.type in ("ALL", "index")
+        ]
+    return [table for table in scans if table not in small_tables]
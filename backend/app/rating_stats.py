@@ -0,0 +1,105 @@
+# backend/app/rating_stats.py
+# Per-resource rating aggregates, updated with the ratings themselves
+from typing import Optional
+
+from sqlalchemy import case, func, update
+
+from . import models
+from .change_feed import record_changes
+
+STARS = range(1, 6)
+
+def rating_deltas(new: int, old: Optional[int] = None) -> dict:
+    """
+    Column increments for a rating of new stars, replacing old when the user
+    had already rated the resource
+    """
+    deltas = {}
+    if old is None:
+        deltas["rating_count"] = 1
+    if new != old:
+        deltas["rating_sum"] = new - (old or 0)
+        deltas[f"rating_{new}"] = 1
+        if old in STARS:
+            deltas[f"rating_{old}"] = -1
+    return deltas
+
+def record_rating(db, resource_id: int, new: int, old: Optional[int] = None):
+    """
+    Apply one rating to the aggregates. Runs in the caller's transaction, so
+    the rating and the aggregates commit together.
+    """
+    deltas = rating_deltas(new, old)
+    if deltas:
+        record_rating_deltas(db, {resource_id: deltas})
+
+def record_rating_deltas(db, deltas_by_resource: dict):
+    """
+    Apply {resource_id: {column: increment}} to any number of resources with
+    one UPDATE, then recompute their averages. The average is set in a
+    second statement because MySQL evaluates SET clauses in order, with the
+    new values.
+    """
+    per_column = {}
+    for resource_id, deltas in deltas_by_resource.items():
+        for column, delta in deltas.items():
+            if delta:
+                per_column.setdefault(column, {})[resource_id] = delta
+    if not per_column:
+        return
+    resource_ids = list(deltas_by_resource)
+    db.execute(
+        update(models.Resource)
+        .where(models.Resource.id.in_(resource_ids))
+        .values(**{
+            column: getattr(models.Resource, column) + case(deltas, value=models.Resource.id, else_=0)
+            for column, deltas in per_column.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
+    _update_averages(db, resource_ids)
+    # The aggregates are part of the synced resources
+    record_changes(db, "resource", resource_ids)
+
+def _update_averages(db, resource_ids):
+    db.execute(
+        update(models.Resource)
+        .where(models.Resource.id.in_(resource_ids), models.Resource.rating_count > 0)
+        .values(rating_average=models.Resource.rating_sum * 1.0 / models.Resource.rating_count)
+        .execution_options(synchronize_session=False)
+    )
+
+def rebuild_rating_stats(db):
+    """
+    Recompute every resource's aggregates from the ratings table, for data
+    that predates them
+    """
+    columns = [
+        func.count(models.Rating.id),
+        func.coalesce(func.sum(models.Rating.rating), 0),
+    ] + [func.sum(case((models.Rating.rating == stars, 1), else_=0)) for stars in STARS]
+    rows = db.query(models.Rating.resource_id, *columns).filter(
+        models.Rating.rating.between(1, 5)
+    ).group_by(models.Rating.resource_id).all()
+
+    db.execute(
+        update(models.Resource)
+        .values(
+            rating_count=0, rating_sum=0, rating_average=0,
+            **{f"rating_{stars}": 0 for stars in STARS}
+        )
+        .execution_options(synchronize_session=False)
+    )
+    for resource_id, count, total, *histogram in rows:
+        db.execute(
+            update(models.Resource)
+            .where(models.Resource.id == resource_id)
+            .values(
+                rating_count=count,
+                rating_sum=total,
+                rating_average=float(total) / count,
+                **{f"rating_{stars}": int(histogram[stars - 1] or 0) for stars in STARS}
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
@@ -0,0 +1,162 @@
+# backend/app/representations.py
+# Sparse fieldsets and response formats for catalogue listings
+from typing import Optional
+
+import msgpack
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from . import models, schemas
+from .pagination import set_next_cursor
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MEDIA_TYPES = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]  # JSON unless asked otherwise
+
+# Fields of schemas.Resource a listing can be narrowed to -> the columns
+# they are read from
+RESOURCE_FIELDS = {
+    "id": [models.Resource.id],
+    "title": [models.Resource.title],
+    "description": [models.Resource.description],
+    "file_type": [models.Resource.file_type],
+    "subject": [models.Resource.subject],
+    "grade_level": [models.Resource.grade_level],
+    "country": [models.Resource.country],
+    "language": [models.Resource.language],
+    "tags": [models.Resource.tags],
+    "uploaded_by": [models.Resource.uploaded_by],
+    "upload_date": [models.Resource.upload_date],
+    "is_approved": [models.Resource.is_approved],
+    "view_count": [models.Resource.view_count],
+    "file_path": [models.Resource.file_path],
+    "rating_count": [models.Resource.rating_count],
+    "rating_average": [models.Resource.rating_average],
+    "rating_histogram": [
+        models.Resource.rating_1,
+        models.Resource.rating_2,
+        models.Resource.rating_3,
+        models.Resource.rating_4,
+        models.Resource.rating_5,
+    ],
+}
+
+def parse_fields(fields: Optional[str]):
+    """
+    The names in a ?fields=title,subject list, in schema order, or None for
+    every field. id is always included.
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - RESOURCE_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {', '.join(sorted(unknown))}, expected some of: {', '.join(RESOURCE_FIELDS)}"
+        )
+    return tuple(name for name in RESOURCE_FIELDS if name in names or name == "id")
+
+def check_expand(fields, expand: bool):
+    if fields is not None and expand:
+        raise HTTPException(status_code=400, detail="fields and expand cannot be combined")
+
+def resource_columns(fields, keys=()):
+    """
+    The columns to select for fields, plus the sort key columns keyset_page
+    reads the next cursor from
+    """
+    columns = {}
+    for name in fields:
+        for column in RESOURCE_FIELDS[name]:
+            columns.setdefault(column.key, column)
+    for column, _ in keys:
+        columns.setdefault(column.key, column)
+    return list(columns.values())
+
+def query_resources(db, fields, keys=()):
+    """
+    A resource query selecting only what fields need, or whole rows
+    """
+    if fields is None:
+        return db.query(models.Resource)
+    return db.query(*resource_columns(fields, keys))
+
+def resource_items(rows, fields):
+    """
+    Rows of query_resources as listing items: schemas.Resource, or dicts of
+    just the requested fields
+    """
+    if fields is None:
+        return [schemas.Resource.from_orm(row) for row in rows]
+    items = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == "rating_histogram":
+                item[name] = [getattr(row, column.key) or 0 for column in RESOURCE_FIELDS[name]]
+            else:
+                item[name] = getattr(row, name)
+        items.append(item)
+    return items
+
+def _accepted(accept: str):
+    ranges = []
+    for part in accept.split(","):
+        media_range, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range.strip().lower(), quality))
+    return ranges
+
+def negotiate(accept: str, offered=MEDIA_TYPES) -> str:
+    """
+    The offered media type an Accept header prefers. Each type takes the
+    quality of its most specific matching range; ties go to the more
+    specific match, then to the first offered.
+    """
+    best, best_rank = offered[0], None
+    ranges = _accepted(accept or "")
+    for position, media_type in enumerate(offered):
+        quality, specificity = 0.0, -1
+        for media_range, range_quality in ranges:
+            if media_range == media_type:
+                match = 2
+            elif media_range == media_type.split("/")[0] + "/*":
+                match = 1
+            elif media_range == "*/*":
+                match = 0
+            else:
+                continue
+            if match > specificity:
+                quality, specificity = range_quality, match
+        rank = (quality, specificity, -position)
+        if quality > 0 and (best_rank is None or rank > best_rank):
+            best, best_rank = media_type, rank
+    return best
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        # The same values as the JSON response, packed
+        return msgpack.packb(jsonable_encoder(content), use_bin_type=True)
+
+def listing_response(request, items, next_cursor=None):
+    """
+    A listing as JSON or msgpack, whichever the Accept header prefers
+    """
+    if negotiate(request.headers.get("accept", "")) == MSGPACK_MEDIA_TYPE:
+        response = MsgpackResponse(items)
+    else:
+        response = JSONResponse(jsonable_encoder(items))
+    response.headers["Vary"] = "Accept"
+    set_next_cursor(response, next_cursor)
+    return response
@@ -0,0 +1,26 @@
+# backend/app/resource_detail.py
+# A resource with everything its page shows, in a fixed number of queries
+from sqlalchemy.orm import joinedload, selectinload
+
+from . import models, schemas
+
+# The uploader is joined into the resource query; each collection is read
+# by one SELECT ... WHERE resource_id IN (...) for all resources loaded, so
+# a page of resources costs as many queries as a single one
+DETAIL_OPTIONS = [
+    joinedload(models.Resource.uploader),
+    selectinload(models.Resource.translations),
+    selectinload(models.Resource.ratings),
+    selectinload(models.Resource.tts),
+    selectinload(models.Resource.summaries),
+]
+DETAIL_QUERIES = 1 + 4  # See tests/test_resource_detail.py and check_queries.py
+
+def query_details(db):
+    return db.query(models.Resource).options(*DETAIL_OPTIONS)
+
+def get_resource_detail(db, resource_id: int):
+    return query_details(db).filter(models.Resource.id == resource_id).first()
+
+def detail_items(resources):
+    return [schemas.ResourceDetail.from_orm(resource) for resource in resources]
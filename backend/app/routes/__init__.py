@@ -0,0 +1 @@
+# backend/app/routes/__init__.py
@@ -0,0 +1,15 @@
+# backend/app/routes/bundles.py
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from .. import schemas
+from ..database import get_db
+from ..bundles import manifest
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.CatalogueBundle])
+def read_bundles(db: Session = Depends(get_db)):
+    # Each url holds a whole (country, grade_level, language) catalogue and
+    # changes whenever its contents do
+    return manifest(db)
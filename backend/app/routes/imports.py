@@ -0,0 +1,96 @@
+# backend/app/routes/imports.py
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from sqlalchemy.orm import Session
+from typing import Optional
+from .. import models, schemas, auth
+from ..database import get_db
+from ..blob_store import blob_store
+from ..catalogue_import import detect_format, enqueue_import, import_status, IMPORT_FORMATS
+
+router = APIRouter()
+
+def _check_importer(current_user):
+    if current_user.role not in (schemas.UserRole.teacher, schemas.UserRole.admin):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only teachers can import resources"
+        )
+    if current_user.role == schemas.UserRole.teacher and not current_user.is_teacher_verified:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Teacher account not verified"
+        )
+
+def _get_import(db, import_id: int, current_user):
+    catalogue_import = db.query(models.CatalogueImport).filter(models.CatalogueImport.id == import_id).first()
+    if catalogue_import is None or (
+        current_user.role != schemas.UserRole.admin and catalogue_import.uploaded_by != current_user.id
+    ):
+        raise HTTPException(status_code=404, detail="Import not found")
+    return catalogue_import
+
+def _accepted(catalogue_import, job):
+    return {
+        "import_id": catalogue_import.id,
+        "job_id": job.id,
+        "status": catalogue_import.status,
+        "status_url": f"/api/v1/imports/{catalogue_import.id}"
+    }
+
+@router.post("/", response_model=schemas.ImportAccepted, status_code=status.HTTP_202_ACCEPTED)
+def create_import(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    _check_importer(current_user)
+    format = format or detect_format(file.filename)
+    if format not in IMPORT_FORMATS.values():
+        raise HTTPException(status_code=400, detail="Upload a .csv or .jsonl file, or pass format")
+
+    file_hash, file_path, _ = blob_store.put(db, file.file)
+
+    # Uploading the same file again continues its unfinished import
+    catalogue_import = db.query(models.CatalogueImport).filter(
+        models.CatalogueImport.file_hash == file_hash,
+        models.CatalogueImport.uploaded_by == current_user.id,
+        models.CatalogueImport.status != models.ImportStatus.completed
+    ).first()
+    if catalogue_import is not None:
+        db.rollback()  # Keep a single reference to the file
+    else:
+        catalogue_import = models.CatalogueImport(
+            file_path=file_path,
+            file_hash=file_hash,
+            file_name=file.filename,
+            format=format,
+            approve=(current_user.role == schemas.UserRole.admin),  # Auto-approve for admins
+            uploaded_by=current_user.id
+        )
+        db.add(catalogue_import)
+        db.commit()
+
+    # The import runs on the job workers and resumes from its checkpoint
+    job = enqueue_import(db, catalogue_import)
+    return _accepted(catalogue_import, job)
+
+@router.get("/{import_id}", response_model=schemas.CatalogueImport)
+def get_import(
+    import_id: int,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return import_status(_get_import(db, import_id, current_user))
+
+@router.post("/{import_id}/resume", response_model=schemas.ImportAccepted, status_code=status.HTTP_202_ACCEPTED)
+def resume_import(
+    import_id: int,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    catalogue_import = _get_import(db, import_id, current_user)
+    if catalogue_import.status == models.ImportStatus.completed:
+        raise HTTPException(status_code=409, detail="Import already completed")
+    job = enqueue_import(db, catalogue_import)
+    return _accepted(catalogue_import, job)
@@ -0,0 +1,177 @@
+# backend/app/routes/ratings.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List
+from .. import models, schemas, auth
+from ..database import get_db
+from ..rating_stats import rating_deltas, record_rating, record_rating_deltas
+from ..change_feed import record_changes
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Rating)
+def create_rating(
+    rating: schemas.RatingCreate,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Check if resource exists
+    resource = db.query(models.Resource.id).filter(models.Resource.id == rating.resource_id).first()
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    def apply():
+        # Check if user has already rated this resource; locked, so the
+        # aggregates are updated from the rating this replaces
+        existing_rating = db.query(models.Rating).filter(
+            models.Rating.resource_id == rating.resource_id,
+            models.Rating.user_id == current_user.id
+        ).with_for_update().first()
+        
+        if existing_rating:
+            # Update existing rating
+            record_rating(db, rating.resource_id, rating.rating, old=existing_rating.rating)
+            existing_rating.rating = rating.rating
+            existing_rating.review = rating.review
+            db_rating = existing_rating
+        else:
+            # Create new rating
+            db_rating = models.Rating(
+                resource_id=rating.resource_id,
+                user_id=current_user.id,
+                rating=rating.rating,
+                review=rating.review
+            )
+            db.add(db_rating)
+            record_rating(db, rating.resource_id, rating.rating)
+        
+        # The rating and the resource's aggregates commit together
+        db.commit()
+        return db_rating
+
+    try:
+        db_rating = apply()
+    except IntegrityError:
+        # A concurrent first rating by the same user won the unique key,
+        # update that row instead
+        db.rollback()
+        db_rating = apply()
+    db.refresh(db_rating)
+    return db_rating
+
+def _upsert_ratings(db: Session, rows: List[dict]):
+    # One multi-row statement on the (user_id, resource_id) unique key, for
+    # ratings known to exist
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql.insert(models.Rating).values(rows)
+        statement = statement.on_duplicate_key_update(
+            rating=statement.inserted.rating,
+            review=statement.inserted.review
+        )
+    else:
+        statement = sqlite.insert(models.Rating).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "resource_id"],
+            set_={"rating": statement.excluded.rating, "review": statement.excluded.review}
+        )
+    db.execute(statement)
+
+@router.post("/bulk", response_model=schemas.RatingBulkResponse)
+def create_ratings_bulk(
+    batch: schemas.RatingBulkRequest,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Ratings made offline, replayed in the order they were made: the last
+    # one for a resource wins
+    latest = {}
+    for index, item in enumerate(batch.ratings):
+        latest[item.resource_id] = index
+
+    found = {
+        row.id for row in
+        db.query(models.Resource.id).filter(models.Resource.id.in_(list(latest)))
+    }
+    def apply():
+        existing = {}
+        if found:
+            # Locked, so the aggregates are updated from the ratings these replace
+            existing = {
+                row.resource_id: row for row in
+                db.query(models.Rating.resource_id, models.Rating.rating, models.Rating.review).filter(
+                    models.Rating.user_id == current_user.id,
+                    models.Rating.resource_id.in_(list(found))
+                ).with_for_update()
+            }
+
+        results = []
+        created = []
+        updated = []
+        deltas = {}
+        for index, item in enumerate(batch.ratings):
+            result = schemas.RatingBulkResult(
+                index=index,
+                client_id=item.client_id,
+                resource_id=item.resource_id,
+                status=schemas.RatingBulkStatus.error
+            )
+            old = existing.get(item.resource_id)
+            if latest[item.resource_id] != index:
+                result.status = schemas.RatingBulkStatus.superseded
+            elif item.resource_id not in found:
+                result.detail = "Resource not found"
+            elif old is not None and old.rating == item.rating and old.review == item.review:
+                result.status = schemas.RatingBulkStatus.unchanged
+            else:
+                result.status = schemas.RatingBulkStatus.updated if old else schemas.RatingBulkStatus.created
+                (updated if old else created).append({
+                    "resource_id": item.resource_id,
+                    "user_id": current_user.id,
+                    "rating": item.rating,
+                    "review": item.review
+                })
+                deltas[item.resource_id] = rating_deltas(item.rating, old.rating if old else None)
+            results.append(result)
+
+        if deltas:
+            # The ratings and the resources' aggregates commit together. New
+            # ratings are plain inserts, so one that a concurrent replay
+            # inserted first fails the unique key instead of being counted
+            # twice.
+            if created:
+                db.execute(insert(models.Rating).values(created))
+            if updated:
+                _upsert_ratings(db, updated)
+            record_rating_deltas(db, deltas)
+            # The statements bypass the ORM, so log the ratings for sync by hand
+            record_changes(db, "rating", [
+                row.id for row in db.query(models.Rating.id).filter(
+                    models.Rating.user_id == current_user.id,
+                    models.Rating.resource_id.in_(list(deltas))
+                )
+            ])
+        db.commit()
+        return schemas.RatingBulkResponse(applied=len(deltas), results=results)
+
+    try:
+        return apply()
+    except IntegrityError:
+        # A concurrent replay of the same ratings inserted some of them
+        # first, apply the batch again as updates of those
+        db.rollback()
+        return apply()
+
+@router.get("/resource/{resource_id}", response_model=List[schemas.Rating])
+def get_ratings_for_resource(resource_id: int, db: Session = Depends(get_db)):
+    ratings = db.query(models.Rating).filter(models.Rating.resource_id == resource_id).all()
+    return ratings
+
+@router.get("/{rating_id}", response_model=schemas.Rating)
+def get_rating(rating_id: int, db: Session = Depends(get_db)):
+    rating = db.query(models.Rating).filter(models.Rating.id == rating_id).first()
+    if rating is None:
+        raise HTTPException(status_code=404, detail="Rating not found")
+    return rating
\ No newline at end of file
@@ -0,0 +1,258 @@
+# backend/app/routes/resources.py
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from .. import models, schemas, auth
+from ..catalogue import resource_changed, resource_sort_keys
+from ..search import search_resources, search_page, search_filter, rows_in_order
+from ..pagination import keyset_page, MAX_PAGE_SIZE
+from ..representations import parse_fields, check_expand, resource_columns, query_resources, resource_items, listing_response
+from ..resource_detail import query_details, get_resource_detail, detail_items
+from ..view_counter import view_counter
+from ..blob_store import blob_store
+from ..downloads import download_resource
+from ..query_cache import query_cache
+from ..tts_store import tts_store
+from ..jobs import enqueue, PRIORITY_DEFAULT
+from ..database import get_db
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.Resource)
+def create_resource(
+    resource: schemas.ResourceCreate,
+    file: Optional[UploadFile] = File(None),
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Check if user is a teacher
+    if current_user.role != schemas.UserRole.teacher and current_user.role != schemas.UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only teachers can upload resources"
+        )
+    
+    # Check if teacher is verified
+    if current_user.role == schemas.UserRole.teacher and not current_user.is_teacher_verified:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Teacher account not verified"
+        )
+    
+    file_path = file_hash = file_name = None
+    if file:
+        # Stored by content hash, identical uploads share one file
+        file_hash, file_path, _ = blob_store.put(db, file.file)
+        file_name = file.filename
+    
+    # Create resource
+    db_resource = models.Resource(
+        title=resource.title,
+        description=resource.description,
+        file_path=file_path,
+        file_hash=file_hash,
+        file_name=file_name,
+        file_type=resource.file_type,
+        subject=resource.subject,
+        grade_level=resource.grade_level,
+        country=resource.country,
+        language=resource.language,
+        tags=resource.tags,
+        uploaded_by=current_user.id,
+        is_approved=(current_user.role == schemas.UserRole.admin)  # Auto-approve for admins
+    )
+    
+    db.add(db_resource)
+    db.commit()
+    db.refresh(db_resource)
+    resource_changed(db, db_resource)
+    
+    return db_resource
+
+@router.get("/", response_model=List[schemas.Resource])
+def read_resources(
+    request: Request,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    subject: Optional[str] = None,
+    grade_level: Optional[str] = None,
+    country: Optional[str] = None,
+    language: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: bool = False,
+    db: Session = Depends(get_db)
+):
+    keys = resource_sort_keys(sort)
+    # ?fields=id,title,subject selects only those columns; ?expand=true adds
+    # each resource's related rows, as the detail endpoint does
+    fields = parse_fields(fields)
+    check_expand(fields, expand)
+
+    def query_listing():
+        return query_details(db) if expand else query_resources(db, fields, keys)
+
+    def items(rows):
+        return detail_items(rows) if expand else resource_items(rows, fields)
+
+    # ?q= searches the full-text index: best match first, or in sort order
+    # when one is given
+    if q and not sort:
+        ids, next_cursor = search_page(
+            db, q, cursor=cursor, limit=limit, skip=skip,
+            subject=subject, grade_level=grade_level, country=country, language=language
+        )
+        return listing_response(request, items(rows_in_order(query_listing(), ids)), next_cursor)
+
+    def load():
+        query = query_listing().filter(models.Resource.is_approved == True)
+        
+        if q:
+            query = query.filter(search_filter(q))
+        if subject:
+            query = query.filter(models.Resource.subject == subject)
+        if grade_level:
+            query = query.filter(models.Resource.grade_level == grade_level)
+        if country:
+            query = query.filter(models.Resource.country == country)
+        if language:
+            query = query.filter(models.Resource.language == language)
+        
+        # Keyset pagination on the sort keys; pass the X-Next-Cursor header back
+        # as cursor. sort=rating and sort=popular read the listing indexes.
+        rows, next_cursor = keyset_page(query, keys, cursor=cursor, limit=limit, skip=skip)
+        return items(rows), next_cursor
+
+    if q:
+        # Searches are too varied to be worth caching
+        resources, next_cursor = load()
+    else:
+        # The same few filter combinations are requested over and over
+        resources, next_cursor = query_cache.get_or_load(
+            "resources",
+            {"subject": subject, "grade_level": grade_level, "country": country, "language": language},
+            load,
+            skip=skip, limit=limit, cursor=cursor, sort=sort, fields=fields, expand=expand
+        )
+    # JSON, or msgpack for Accept: application/msgpack
+    return listing_response(request, resources, next_cursor)
+
+@router.get("/search", response_model=List[schemas.Resource])
+def search_catalogue(
+    request: Request,
+    q: str,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    subject: Optional[str] = None,
+    grade_level: Optional[str] = None,
+    country: Optional[str] = None,
+    language: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    fields = parse_fields(fields)
+    # Ranked full-text search; every word matches as a prefix
+    resources = search_resources(
+        db, q, limit=limit, offset=skip,
+        columns=resource_columns(fields) if fields else None,
+        subject=subject, grade_level=grade_level, country=country, language=language
+    )
+    return listing_response(request, resource_items(resources, fields))
+
+@router.get("/{resource_id}", response_model=schemas.Resource)
+def read_resource(resource_id: int, db: Session = Depends(get_db)):
+    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    # Count the view in the write-behind buffer instead of updating the row
+    view_counter.increment(resource.id)
+    result = schemas.Resource.from_orm(resource)
+    result.view_count += view_counter.pending_for(resource.id)
+    
+    return result
+
+@router.get("/{resource_id}/detail", response_model=schemas.ResourceDetail)
+def read_resource_detail(resource_id: int, db: Session = Depends(get_db)):
+    # The resource with its uploader, translations, ratings, audio and
+    # summaries, in resource_detail.DETAIL_QUERIES queries
+    resource = get_resource_detail(db, resource_id)
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+
+    view_counter.increment(resource.id)
+    result = schemas.ResourceDetail.from_orm(resource)
+    result.view_count += view_counter.pending_for(resource.id)
+    return result
+
+@router.get("/{resource_id}/download")
+def download(resource_id: int, request: Request, db: Session = Depends(get_db)):
+    # Resumable with Range; only approved resources can be downloaded
+    return download_resource(request, db, resource_id)
+
+@router.get("/{resource_id}/summary", response_model=schemas.Summary)
+def read_summary(resource_id: int, language: str = "en", db: Session = Depends(get_db)):
+    # Summaries are computed in batches after approval, this only reads them
+    summary = db.query(models.Summary).filter(
+        models.Summary.resource_id == resource_id,
+        models.Summary.language == language
+    ).first()
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Summary not available")
+    return summary
+
+@router.get(
+    "/{resource_id}/audio",
+    response_model=schemas.TextToSpeech,
+    responses={202: {"model": schemas.JobAccepted}}
+)
+def read_audio(resource_id: int, language: str = "en", db: Session = Depends(get_db)):
+    # Audio is synthesized once per text and language and served from /audio
+    tts = tts_store.lookup(db, resource_id, language)
+    if tts is not None:
+        return tts
+
+    resource = db.query(models.Resource.id).filter(
+        models.Resource.id == resource_id,
+        models.Resource.is_approved == True
+    ).first()
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    job = enqueue(
+        db,
+        "text_to_speech",
+        {"resource_id": resource_id, "language": language},
+        priority=PRIORITY_DEFAULT,
+        dedupe=True
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.id, "status": job.status.value, "status_url": f"/api/v1/jobs/{job.id}"}
+    )
+
+@router.put("/{resource_id}/approve", response_model=schemas.Resource)
+def approve_resource(
+    resource_id: int,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Only admins can approve resources
+    if current_user.role != schemas.UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can approve resources"
+        )
+    
+    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    resource.is_approved = True
+    db.commit()
+    db.refresh(resource)
+    resource_changed(db, resource)
+    
+    return resource
\ No newline at end of file
@@ -0,0 +1,17 @@
+# backend/app/routes/sync.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from .. import schemas
+from ..database import get_db
+from ..change_feed import changes_since, CHANGE_FEED_MAX_LIMIT
+
+router = APIRouter()
+
+@router.get("/changes", response_model=schemas.ChangeFeed)
+def read_changes(
+    since: int = 0,
+    limit: int = Query(500, ge=1, le=CHANGE_FEED_MAX_LIMIT),
+    db: Session = Depends(get_db)
+):
+    # Call again with the returned cursor while has_more is true
+    return changes_since(db, since, limit)
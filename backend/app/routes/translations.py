@@ -0,0 +1,45 @@
+# backend/app/routes/translations.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+from .. import models, schemas, auth
+from ..database import get_db
+from ..jobs import enqueue, PRIORITY_DEFAULT
+
+router = APIRouter()
+
+@router.post("/", response_model=schemas.JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+def create_translation(
+    translation: schemas.TranslationCreate,
+    current_user: schemas.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Check if resource exists
+    resource = db.query(models.Resource).filter(models.Resource.id == translation.resource_id).first()
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    # Translation runs on the job workers; poll the returned job for the result
+    job = enqueue(
+        db,
+        "translate_resource",
+        translation.dict(exclude_none=True),
+        priority=PRIORITY_DEFAULT,
+        dedupe=True
+    )
+    
+    return {"job_id": job.id, "status": job.status, "status_url": f"/api/v1/jobs/{job.id}"}
+
+@router.get("/resource/{resource_id}", response_model=List[schemas.Translation])
+def get_translations_for_resource(resource_id: int, db: Session = Depends(get_db)):
+    translations = db.query(models.Translation).filter(
+        models.Translation.resource_id == resource_id
+    ).all()
+    return translations
+
+@router.get("/{translation_id}", response_model=schemas.Translation)
+def get_translation(translation_id: int, db: Session = Depends(get_db)):
+    translation = db.query(models.Translation).filter(models.Translation.id == translation_id).first()
+    if translation is None:
+        raise HTTPException(status_code=404, detail="Translation not found")
+    return translation
\ No newline at end of file
@@ -1,9 +1,10 @@
 # backend/app/routes/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import models, schemas, auth
 from ..database import get_db
+from ..pagination import keyset_page, set_next_cursor, MAX_PAGE_SIZE
 
 router = APIRouter()
 
@@ -42,8 +43,17 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = db.query(models.User).offset(skip).limit(limit).all()
+def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    users, next_cursor = keyset_page(
+        db.query(models.User), [(models.User.id, False)], cursor=cursor, limit=limit, skip=skip
+    )
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
@@ -64,7 +74,7 @@ def login(login_request: schemas.LoginRequest, db: Session = Depends(get_db)):
         )
     
     access_token = auth.create_access_token(
-        data={"sub": user.username}
+        data=auth.token_claims(user)
     )
     
     return {"access_token": access_token, "token_type": "bearer", "user": user}
\ No newline at end of file
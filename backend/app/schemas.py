@@ -1,5 +1,5 @@
 # backend/app/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, conint, conlist
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -56,6 +56,9 @@ class Resource(ResourceBase):
     is_approved: bool
     view_count: int
     file_path: Optional[str] = None
+    rating_count: int = 0
+    rating_average: float = 0
+    rating_histogram: List[int] = [0, 0, 0, 0, 0]  # Number of 1..5 star ratings
 
     class Config:
         orm_mode = True
@@ -77,11 +80,33 @@ class Translation(TranslationBase):
     class Config:
         orm_mode = True
 
+class TextToSpeech(BaseModel):
+    id: int
+    resource_id: int
+    language: str
+    audio_path: str  # URL of the audio file
+    size: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class Summary(BaseModel):
+    id: int
+    resource_id: int
+    language: str
+    summary_text: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
 class RatingBase(BaseModel):
     rating: int
     review: Optional[str] = None
 
 class RatingCreate(RatingBase):
+    rating: conint(ge=1, le=5)
     resource_id: int
 
 class Rating(RatingBase):
@@ -93,6 +118,45 @@ class Rating(RatingBase):
     class Config:
         orm_mode = True
 
+class ResourceUploader(BaseModel):
+    id: int
+    username: str
+
+    class Config:
+        orm_mode = True
+
+class ResourceDetail(Resource):
+    # Everything a resource page shows, see resource_detail
+    uploader: Optional[ResourceUploader] = None
+    translations: List[Translation] = []
+    ratings: List[Rating] = []
+    tts: List[TextToSpeech] = []
+    summaries: List[Summary] = []
+
+class RatingBulkItem(RatingCreate):
+    client_id: Optional[str] = None  # The client's id for the rating, echoed back
+
+class RatingBulkRequest(BaseModel):
+    ratings: conlist(RatingBulkItem, min_items=1, max_items=500)
+
+class RatingBulkStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    unchanged = "unchanged"
+    superseded = "superseded"  # A later item in the batch rates the same resource
+    error = "error"
+
+class RatingBulkResult(BaseModel):
+    index: int
+    client_id: Optional[str] = None
+    resource_id: int
+    status: RatingBulkStatus
+    detail: Optional[str] = None
+
+class RatingBulkResponse(BaseModel):
+    applied: int
+    results: List[RatingBulkResult]
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -108,4 +172,79 @@ class USSDRequest(BaseModel):
 
 class USSDResponse(BaseModel):
     message: str
-    status: str = "200"
\ No newline at end of file
+    status: str = "200"
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+class JobAccepted(BaseModel):
+    job_id: int
+    status: JobStatus
+    status_url: str
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class ImportStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row, not counting a CSV header
+    errors: List[str]
+
+class CatalogueImport(BaseModel):
+    id: int
+    file_name: Optional[str] = None
+    format: str
+    status: ImportStatus
+    approve: bool
+    rows_read: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[ImportRowError] = []
+    created_at: datetime
+    updated_at: datetime
+
+class ImportAccepted(BaseModel):
+    import_id: int
+    job_id: int
+    status: ImportStatus
+    status_url: str
+
+class DeletedIds(BaseModel):
+    resources: List[int] = []
+    translations: List[int] = []
+    ratings: List[int] = []
+
+class ChangeFeed(BaseModel):
+    cursor: int  # Pass back as since for the next changes
+    has_more: bool
+    resources: List[Resource] = []
+    translations: List[Translation] = []
+    ratings: List[Rating] = []
+    deleted: DeletedIds  # Tombstones: removed, or no longer approved
+
+class CatalogueBundle(BaseModel):
+    country: str
+    grade_level: str
+    language: str
+    version: str
+    url: str  # msgpack, served gzip- or zstd-encoded and cached forever
+    size: int  # Bytes, gzip-compressed
+    resource_count: int
+    built_at: datetime
@@ -0,0 +1,180 @@
+# backend/app/search.py
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import false, text
+
+from . import models
+from .database import engine
+from .pagination import encode_cursor, decode_cursor
+
+FULLTEXT_INDEX = "ft_resources_search"
+FTS_TABLE = "resources_fts"
+# Resource columns a search can be filtered on
+SEARCH_FILTERS = ("subject", "grade_level", "country", "language")
+
+def search_terms(query: str):
+    """
+    Split a user query into plain words, dropping search operators
+    """
+    return re.findall(r"\w+", query.lower())
+
+def _filter_sql(filters: dict):
+    clauses = []
+    params = {}
+    for column in SEARCH_FILTERS:
+        if filters.get(column):
+            clauses.append(f"AND r.{column} = :{column}")
+            params[column] = filters[column]
+    return " ".join(clauses), params
+
+class MySQLSearchIndex:
+    """
+    Ranked prefix search over a FULLTEXT index on title, description and tags.
+    InnoDB keeps the index in sync on every write.
+    """
+
+    def setup(self, engine):
+        with engine.begin() as connection:
+            exists = connection.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'resources' AND index_name = :name"
+            ), {"name": FULLTEXT_INDEX}).scalar()
+            if not exists:
+                connection.execute(text(
+                    f"ALTER TABLE resources ADD FULLTEXT INDEX {FULLTEXT_INDEX} (title, description, tags)"
+                ))
+
+    def match_query(self, terms):
+        # Every word is required and may be a prefix
+        return " ".join([f"+{term}*" for term in terms])
+
+    def match_filter(self, terms):
+        return text(
+            "MATCH(resources.title, resources.description, resources.tags) AGAINST (:search IN BOOLEAN MODE)"
+        ).bindparams(search=self.match_query(terms))
+
+    def search_ids(self, db, terms, filters: dict, limit: int, offset: int):
+        filter_sql, params = _filter_sql(filters)
+        params.update({"q": self.match_query(terms), "limit": limit, "offset": offset})
+        rows = db.execute(text(
+            "SELECT r.id, MATCH(r.title, r.description, r.tags) AGAINST (:q IN BOOLEAN MODE) AS score "
+            "FROM resources r "
+            "WHERE r.is_approved = 1 AND MATCH(r.title, r.description, r.tags) AGAINST (:q IN BOOLEAN MODE) "
+            f"{filter_sql} "
+            "ORDER BY score DESC, r.id LIMIT :limit OFFSET :offset"
+        ), params)
+        return [row.id for row in rows]
+
+# Keep the FTS5 table in sync with every write to resources
+SQLITE_FTS_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON resources WHEN new.is_approved = 1 BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags) VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, tags, is_approved ON resources BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags)
+            SELECT new.id, new.title, new.description, new.tags WHERE new.is_approved = 1;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON resources BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+)
+
+class SQLiteSearchIndex:
+    """
+    Ranked prefix search over an FTS5 table holding the approved resources,
+    keyed by resource id and maintained by triggers.
+    """
+
+    def setup(self, engine):
+        with engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(title, description, tags, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+            for trigger in SQLITE_FTS_TRIGGERS:
+                connection.execute(text(trigger))
+            indexed = connection.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar()
+            if not indexed:
+                connection.execute(text(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, description, tags) "
+                    "SELECT id, title, description, tags FROM resources WHERE is_approved = 1"
+                ))
+
+    def match_query(self, terms):
+        return " AND ".join([f'"{term}"*' for term in terms])
+
+    def match_filter(self, terms):
+        return text(
+            f"resources.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :search)"
+        ).bindparams(search=self.match_query(terms))
+
+    def search_ids(self, db, terms, filters: dict, limit: int, offset: int):
+        filter_sql, params = _filter_sql(filters)
+        params.update({"q": self.match_query(terms), "limit": limit, "offset": offset})
+        # bm25() is lower for better matches; title hits weigh most
+        rows = db.execute(text(
+            f"SELECT r.id, bm25({FTS_TABLE}, 10.0, 2.0, 5.0) AS score "
+            f"FROM {FTS_TABLE} JOIN resources r ON r.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :q AND r.is_approved = 1 {filter_sql} "
+            "ORDER BY score, r.id LIMIT :limit OFFSET :offset"
+        ), params)
+        return [row.id for row in rows]
+
+def get_search_index(engine):
+    if engine.dialect.name == "sqlite":
+        return SQLiteSearchIndex()
+    return MySQLSearchIndex()
+
+def search_resources(db, query: str, limit: int = 20, offset: int = 0, columns=None, **filters):
+    """
+    Approved resources matching every word of the query (as prefixes), best match first.
+    With columns, rows of just those columns, which must include the id.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    ids = search_index.search_ids(db, terms, filters, limit, offset)
+    return rows_in_order(db.query(*(columns or [models.Resource])), ids)
+
+def rows_in_order(query, ids):
+    """
+    The rows of a resource query with these ids, in the order of ids
+    """
+    if not ids:
+        return []
+    rows = query.filter(models.Resource.id.in_(ids)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[resource_id] for resource_id in ids if resource_id in by_id]
+
+def search_page(db, query: str, cursor=None, limit: int = 20, skip: int = 0, **filters):
+    """
+    The ids of one page of matches, best first, and the cursor of the next
+    page or None, as keyset_page returns them. Scores are not stable keys,
+    so the cursor holds the position in the ranking.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], None
+    offset = skip
+    if cursor:
+        offset = decode_cursor(cursor, 1)[0]
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    ids = search_index.search_ids(db, terms, filters, limit + 1, offset)
+    next_cursor = encode_cursor([offset + limit]) if len(ids) > limit else None
+    return ids[:limit], next_cursor
+
+def search_filter(query: str):
+    """
+    A filter keeping the resources that match every word of the query, for
+    listings in another order than best match
+    """
+    terms = search_terms(query)
+    if not terms:
+        return false()
+    return search_index.match_filter(terms)
+
+# Global instance
+search_index = get_search_index(engine)
@@ -0,0 +1,293 @@
+# backend/app/session_store.py
+import argparse
+import logging
+import os
+import queue
+import stat
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Session store settings - "memory" keeps state in this process, "socket" shares
+# one store between workers through a local socket (see serve_session_store)
+USSD_SESSION_BACKEND = os.getenv("USSD_SESSION_BACKEND", "memory")
+USSD_SESSION_TTL = int(os.getenv("USSD_SESSION_TTL", "180"))  # Gateways drop idle sessions after ~3 minutes
+USSD_SESSION_MAX_ENTRIES = int(os.getenv("USSD_SESSION_MAX_ENTRIES", "50000"))
+# Private to the user the app runs as; created 0700 when missing
+RUNTIME_DIR = os.getenv("RUNTIME_DIR", "run")
+USSD_SESSION_ADDRESS = os.getenv("USSD_SESSION_ADDRESS", os.path.join(RUNTIME_DIR, "ussd_sessions.sock"))
+# The socket carries pickles, so anyone who can connect with the key can run
+# code in the store process. There is no default: the socket backend will
+# not start without one.
+USSD_SESSION_AUTHKEY = os.getenv("USSD_SESSION_AUTHKEY")
+
+# Columns of ussd_sessions that make up the state of a session
+STATE_FIELDS = (
+    "phone_number", "menu_level", "selected_subject", "selected_grade", "selected_resource_id",
+    "search_term", "page", "target_language",
+)
+# Screens that cannot be shown without a search term
+SEARCH_SCREENS = ("search_results", "search_result_options", "search_translation_language")
+
+def new_session_state(session_id: str, phone_number: str) -> dict:
+    return {
+        "session_id": session_id,
+        "phone_number": phone_number,
+        "menu_level": "main",
+        "selected_subject": None,
+        "selected_grade": None,
+        "selected_resource_id": None,
+        "search_term": None,
+        "page": 0,
+        "target_language": None,
+        # Kept in the store only
+        "depth": 0,
+    }
+
+class InMemorySessionStore:
+    """
+    LRU of session states with TTL eviction. Entries are kept in order of last
+    access, so expired entries are always found at the head.
+    """
+
+    def __init__(self, ttl: int = USSD_SESSION_TTL, max_entries: int = USSD_SESSION_MAX_ENTRIES, on_evict=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # session_id -> (expires_at, state)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at < time.monotonic():
+                del self._entries[session_id]
+                evicted = [state]
+            else:
+                self._entries.move_to_end(session_id)
+                return dict(state)
+        self._evicted(evicted)
+        return None
+
+    def put(self, session_id: str, state: dict):
+        with self._lock:
+            now = time.monotonic()
+            self._entries[session_id] = (now + self.ttl, dict(state))
+            self._entries.move_to_end(session_id)
+            evicted = self._evict_locked(now)
+        self._evicted(evicted)
+
+    def end(self, session_id: str):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        return entry[1] if entry else None
+
+    def snapshot(self):
+        with self._lock:
+            return [dict(state) for _, state in self._entries.values()]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict_locked(self, now):
+        evicted = []
+        while self._entries:
+            session_id, (expires_at, state) = next(iter(self._entries.items()))
+            if expires_at >= now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[session_id]
+            evicted.append(state)
+        return evicted
+
+    def _evicted(self, states):
+        # Abandoned sessions are written back so they can be audited
+        if self.on_evict:
+            for state in states:
+                self.on_evict(state)
+
+class _SessionStoreManager(BaseManager):
+    pass
+
+def _authkey(authkey) -> bytes:
+    if not authkey:
+        raise RuntimeError("Set USSD_SESSION_AUTHKEY to a secret to use the socket session store")
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+def _private_address(address: str) -> str:
+    """
+    address, after checking that only this user can reach its directory
+    """
+    directory = os.path.dirname(os.path.abspath(address))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory == os.path.abspath(RUNTIME_DIR):
+        os.chmod(directory, 0o700)
+    if stat.S_IMODE(os.stat(directory).st_mode) & 0o077:
+        raise RuntimeError(f"{directory} is open to other users, serve the USSD session store from a 0700 directory")
+    return address
+
+class SocketSessionStore:
+    """
+    Client for a store served by serve_session_store(), shared by all workers
+    on the host through a local (unix) socket.
+    """
+
+    def __init__(self, address: str = USSD_SESSION_ADDRESS, authkey: str = USSD_SESSION_AUTHKEY):
+        self.address = address
+        self.authkey = _authkey(authkey)
+        self._store = None
+        self._lock = threading.Lock()
+
+    def _proxy(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    _SessionStoreManager.register("get_store")
+                    manager = _SessionStoreManager(address=self.address, authkey=self.authkey)
+                    manager.connect()
+                    self._store = manager.get_store()
+        return self._store
+
+    def get(self, session_id: str):
+        return self._proxy().get(session_id)
+
+    def put(self, session_id: str, state: dict):
+        self._proxy().put(session_id, state)
+
+    def end(self, session_id: str):
+        return self._proxy().end(session_id)
+
+    def snapshot(self):
+        # The serving process owns the states and writes them back itself
+        return []
+
+def _write_sessions(states):
+    db = SessionLocal()
+    try:
+        session_ids = [state["session_id"] for state in states]
+        existing = {
+            row.session_id: row
+            for row in db.query(models.USSDSession).filter(models.USSDSession.session_id.in_(session_ids))
+        }
+        for state in states:
+            row = existing.get(state["session_id"])
+            if row is None:
+                row = models.USSDSession(session_id=state["session_id"])
+                db.add(row)
+                existing[state["session_id"]] = row
+            for field in STATE_FIELDS:
+                setattr(row, field, state.get(field))
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to write back %d USSD sessions", len(states))
+    finally:
+        db.close()
+
+class SessionWriteBack:
+    """
+    Writes finished or evicted session states to ussd_sessions from a
+    background thread, in batches.
+    """
+
+    def __init__(self, batch_size: int = 200):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def schedule(self, state: dict):
+        self._queue.put(dict(state))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ussd-writeback", daemon=True)
+                    self._thread.start()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self):
+        """
+        Write everything still queued from the calling thread
+        """
+        batch = self._drain()
+        while batch:
+            _write_sessions(batch)
+            batch = self._drain()
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(self._queue.get())
+            _write_sessions(batch)
+
+def load_session_state(db, session_id: str):
+    """
+    Recover a session from ussd_sessions, e.g. after a restart mid-session
+    """
+    row = db.query(models.USSDSession).filter(models.USSDSession.session_id == session_id).first()
+    if row is None:
+        return None
+    state = new_session_state(row.session_id, row.phone_number)
+    for field in STATE_FIELDS:
+        state[field] = getattr(row, field)
+    state["page"] = state["page"] or 0
+    if state["menu_level"] in SEARCH_SCREENS and not state["search_term"]:
+        # Written back before search terms were kept; start over
+        return new_session_state(row.session_id, row.phone_number)
+    return state
+
+def serve_session_store(address: str = USSD_SESSION_ADDRESS, authkey: str = USSD_SESSION_AUTHKEY):
+    """
+    Serve a shared session store on a local socket, for multi-worker deployments
+    """
+    authkey = _authkey(authkey)
+    address = _private_address(address)
+    store = InMemorySessionStore(on_evict=write_back.schedule)
+    _SessionStoreManager.register("get_store", callable=lambda: store)
+    manager = _SessionStoreManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    try:
+        server.serve_forever()
+    finally:
+        write_back_all(store)
+
+def write_back_all(store):
+    for state in store.snapshot():
+        write_back.schedule(state)
+    write_back.flush()
+
+# Global instances
+write_back = SessionWriteBack()
+
+if USSD_SESSION_BACKEND == "socket":
+    session_store = SocketSessionStore()
+else:
+    session_store = InMemorySessionStore(on_evict=write_back.schedule)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the USSD session store shared by the API workers")
+    parser.add_argument("--address", default=USSD_SESSION_ADDRESS, help="Socket to listen on")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    serve_session_store(args.address)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# backend/app/summarizer.py
+# Extractive summaries: the most central sentences of a text
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+SUMMARY_SENTENCES = int(os.getenv("SUMMARY_SENTENCES", "3"))
+DAMPING = 0.85
+ITERATIONS = 50
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+WORD_PATTERN = re.compile(r"\w+")
+
+def split_sentences(text: str):
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text or "") if sentence.strip()]
+
+def _words(sentence: str):
+    return [word for word in WORD_PATTERN.findall(sentence.lower()) if len(word) > 2]
+
+def _rank(weights):
+    """
+    TextRank over the cosine similarities of the sentence vectors: the
+    stationary scores of a random walk between similar sentences
+    """
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    vectors = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, totals, out=np.zeros_like(similarity), where=totals > 0)
+
+    count = len(weights)
+    scores = np.full(count, 1.0 / count)
+    for _ in range(ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+def summarize_batch(texts, max_sentences: int = SUMMARY_SENTENCES):
+    """
+    Extractive summaries of many texts at once: the max_sentences most
+    central sentences of each, in their original order. Word weights are
+    TF-IDF with document frequencies over the sentences of the whole batch.
+    """
+    documents = [split_sentences(text) for text in texts]
+    tokenized = [[_words(sentence) for sentence in sentences] for sentences in documents]
+
+    frequency = Counter()
+    total = 0
+    for sentences in tokenized:
+        for words in sentences:
+            frequency.update(set(words))
+            total += 1
+
+    summaries = []
+    for sentences, words in zip(documents, tokenized):
+        if len(sentences) <= max_sentences:
+            summaries.append(" ".join(sentences))
+            continue
+
+        vocabulary = {word: column for column, word in enumerate(sorted({word for sentence in words for word in sentence}))}
+        if not vocabulary:
+            summaries.append(" ".join(sentences[:max_sentences]))
+            continue
+        idf = np.zeros(len(vocabulary))
+        for word, column in vocabulary.items():
+            idf[column] = math.log((1 + total) / (1 + frequency[word])) + 1
+
+        counts = np.zeros((len(sentences), len(vocabulary)))
+        for row, sentence in enumerate(words):
+            for word, count in Counter(sentence).items():
+                counts[row, vocabulary[word]] = count
+
+        scores = _rank(counts * idf)
+        chosen = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+        summaries.append(" ".join(sentences[index] for index in chosen))
+    return summaries
+
+def summarize(text: str, max_sentences: int = SUMMARY_SENTENCES) -> str:
+    return summarize_batch([text], max_sentences)[0]
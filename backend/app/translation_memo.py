@@ -0,0 +1,127 @@
+# backend/app/translation_memo.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .ai_services import ai_services
+
+TRANSLATION_MEMO_MAX_ENTRIES = int(os.getenv("TRANSLATION_MEMO_MAX_ENTRIES", "5000"))
+TRANSLATION_WAIT_TIMEOUT = 60
+
+def source_digest(text: str, source_language: str = "en") -> str:
+    return hashlib.sha256(f"{source_language}\0{text}".encode("utf-8")).hexdigest()
+
+class TranslationMemo:
+    """
+    Translations by digest of the source text and target language: an LRU in
+    memory in front of the translation_memo table. Concurrent requests for
+    the same translation in a process wait for a single backend call.
+    """
+
+    def __init__(self, max_entries: int = TRANSLATION_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (digest, target_language) -> translated text
+        self._in_flight = {}  # (digest, target_language) -> Future
+        self._lock = threading.Lock()
+
+    def lookup(self, db, text: str, target_language: str, source_language: str = "en"):
+        """
+        A translation that was already made, or None; never calls the backend
+        """
+        key = (source_digest(text, source_language), target_language)
+        translated = self._entries.get(key)
+        if translated is None:
+            translated = self._load(db, key)
+            if translated is not None:
+                self._remember(key, translated)
+        return translated
+
+    def translate(self, db, text: str, target_language: str, source_language: str = "en") -> str:
+        key = (source_digest(text, source_language), target_language)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result(timeout=TRANSLATION_WAIT_TIMEOUT)
+
+        try:
+            translated = self._load(db, key)
+            if translated is None:
+                translated = ai_services.translate_text(text, target_language, source_language)
+                self._store(db, key, translated)
+            self._remember(key, translated)
+            future.set_result(translated)
+            return translated
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _load(self, db, key):
+        digest, target_language = key
+        entry = db.query(models.TranslationMemo.translated_text).filter(
+            models.TranslationMemo.source_digest == digest,
+            models.TranslationMemo.target_language == target_language
+        ).first()
+        return entry.translated_text if entry else None
+
+    def _store(self, db, key, translated: str):
+        digest, target_language = key
+        try:
+            with db.begin_nested():
+                db.add(models.TranslationMemo(
+                    source_digest=digest,
+                    target_language=target_language,
+                    translated_text=translated
+                ))
+        except IntegrityError:
+            pass  # Another worker stored the same translation first
+        db.commit()
+
+    def _remember(self, key, translated: str):
+        with self._lock:
+            self._entries[key] = translated
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def save_translation(db, resource_id: int, language: str, **fields):
+    """
+    Insert or update the translation of a resource into a language; there is
+    at most one per (resource_id, language)
+    """
+    def apply():
+        translation = db.query(models.Translation).filter(
+            models.Translation.resource_id == resource_id,
+            models.Translation.language == language
+        ).first()
+        if translation is None:
+            translation = models.Translation(resource_id=resource_id, language=language)
+            db.add(translation)
+        for field, value in fields.items():
+            setattr(translation, field, value)
+        db.commit()
+        return translation
+
+    try:
+        translation = apply()
+    except IntegrityError:
+        # A concurrent request inserted it first, update that row instead
+        db.rollback()
+        translation = apply()
+    db.refresh(translation)
+    return translation
+
+# Global instance
+translation_memo = TranslationMemo()
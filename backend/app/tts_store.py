@@ -0,0 +1,196 @@
+# backend/app/tts_store.py
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import wave
+from datetime import datetime, timedelta
+
+import requests
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+TTS_ROOT = os.getenv("TTS_ROOT", "audio")
+TTS_URL_PREFIX = "/audio"  # Where TTS_ROOT is mounted as static files
+TTS_MAX_BYTES = int(os.getenv("TTS_MAX_BYTES", str(1024 * 1024 * 1024)))
+TTS_SYNTHESIZER = os.getenv("TTS_SYNTHESIZER", "local")
+TTS_API_URL = os.getenv("TTS_API_URL", "https://api.example.com/tts")
+# last_accessed is written at most this often per artifact
+TTS_TOUCH_INTERVAL = timedelta(hours=1)
+
+def tts_digest(text: str, language: str) -> str:
+    # Stable across processes and restarts, unlike hash()
+    return hashlib.sha256(f"{language}\0{text}".encode("utf-8")).hexdigest()
+
+class LocalSynthesizer:
+    """
+    Stand-in for a speech backend: a short silent WAV whose length follows
+    the text, so the pipeline runs without network access
+    """
+
+    extension = "wav"
+    sample_rate = 8000
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        seconds = min(max(len(text.split()) * 0.4, 1), 600)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(1)
+            audio.setframerate(self.sample_rate)
+            audio.writeframes(b"\x80" * int(seconds * self.sample_rate))
+        return buffer.getvalue()
+
+class HTTPSynthesizer:
+    """
+    A speech API that takes {text, language} and answers with MP3 audio
+    """
+
+    extension = "mp3"
+
+    def __init__(self, url: str = TTS_API_URL):
+        self.url = url
+
+    def synthesize(self, text: str, language: str) -> bytes:
+        response = requests.post(self.url, json={"text": text, "language": language}, timeout=60)
+        response.raise_for_status()
+        return response.content
+
+SYNTHESIZERS = {
+    "local": LocalSynthesizer,
+    "http": HTTPSynthesizer,
+}
+
+class TTSStore:
+    """
+    Audio files by digest of (language, text), generated once and recorded in
+    text_to_speech. The least recently used files are deleted once the
+    store grows past max_bytes.
+    """
+
+    def __init__(self, root: str = TTS_ROOT, synthesizer=None, max_bytes: int = TTS_MAX_BYTES):
+        self.root = root
+        self.synthesizer = synthesizer or SYNTHESIZERS[TTS_SYNTHESIZER]()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def relative_path(self, digest: str, language: str) -> str:
+        return f"{language}/{digest[:2]}/{digest}.{self.synthesizer.extension}"
+
+    def url_for(self, relative_path: str) -> str:
+        return f"{TTS_URL_PREFIX}/{relative_path}"
+
+    def ensure_file(self, text: str, language: str):
+        """
+        Synthesize the audio unless it is already on disk. Returns
+        (digest, relative path, size, whether it was synthesized now).
+        """
+        digest = tts_digest(text, language)
+        relative_path = self.relative_path(digest, language)
+        path = os.path.join(self.root, relative_path)
+        created = not os.path.exists(path)
+        if created:
+            audio = self.synthesizer.synthesize(text, language)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as out:
+                out.write(audio)
+            os.replace(tmp_path, path)
+        return digest, relative_path, os.path.getsize(path), created
+
+    def get_or_create(self, db, resource_id: int, text: str, language: str):
+        """
+        The text_to_speech row of a resource in a language, synthesizing the
+        audio the first time its text is seen
+        """
+        digest, relative_path, size, created = self.ensure_file(text, language)
+
+        def record():
+            tts = db.query(models.TextToSpeech).filter(
+                models.TextToSpeech.resource_id == resource_id,
+                models.TextToSpeech.language == language
+            ).first()
+            if tts is None:
+                tts = models.TextToSpeech(resource_id=resource_id, language=language)
+                db.add(tts)
+            tts.digest = digest
+            tts.audio_path = self.url_for(relative_path)
+            tts.size = size
+            tts.last_accessed = datetime.utcnow()
+            db.commit()
+            return tts
+
+        try:
+            tts = record()
+        except IntegrityError:
+            # Recorded concurrently by another worker, update that row instead
+            db.rollback()
+            tts = record()
+        if created:
+            self.evict(db)
+        return tts
+
+    def lookup(self, db, resource_id: int, language: str):
+        """
+        The recorded audio of a resource, or None when it was never made or
+        was evicted. Marks it as used.
+        """
+        tts = db.query(models.TextToSpeech).filter(
+            models.TextToSpeech.resource_id == resource_id,
+            models.TextToSpeech.language == language
+        ).first()
+        if tts is None or tts.digest is None:
+            return None
+        relative_path = tts.audio_path[len(TTS_URL_PREFIX) + 1:]
+        if not os.path.exists(os.path.join(self.root, relative_path)):
+            return None
+        now = datetime.utcnow()
+        if tts.last_accessed is None or now - tts.last_accessed > TTS_TOUCH_INTERVAL:
+            tts.last_accessed = now
+            db.commit()
+        return tts
+
+    def evict(self, db):
+        """
+        Delete the least recently used files until the store is under its cap
+        """
+        with self._lock:
+            artifacts = db.query(
+                models.TextToSpeech.digest,
+                func.max(models.TextToSpeech.audio_path).label("audio_path"),
+                func.max(models.TextToSpeech.size).label("size"),
+                func.max(models.TextToSpeech.last_accessed).label("last_accessed"),
+            ).filter(models.TextToSpeech.digest.isnot(None)).group_by(
+                models.TextToSpeech.digest
+            ).order_by(func.max(models.TextToSpeech.last_accessed)).all()
+
+            total = sum(artifact.size or 0 for artifact in artifacts)
+            evicted = []
+            for artifact in artifacts:
+                if total <= self.max_bytes:
+                    break
+                path = os.path.join(self.root, artifact.audio_path[len(TTS_URL_PREFIX) + 1:])
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= artifact.size or 0
+                evicted.append(artifact.digest)
+
+            if evicted:
+                # Evicted audio is synthesized again when it is next requested
+                db.query(models.TextToSpeech).filter(
+                    models.TextToSpeech.digest.in_(evicted)
+                ).delete(synchronize_session=False)
+                db.commit()
+                logger.info("Evicted %d TTS files, %d bytes remain", len(evicted), total)
+            return evicted
+
+# Global instance
+tts_store = TTSStore()
@@ -1,278 +1,163 @@
 # backend/app/ussd.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from . import models, schemas
-from .database import get_db
-from .ai_services import ai_services
+from .async_database import get_async_db
+from .menu_cache import menu_cache, MENU_MAX_RESOURCES
+from .search import search_resources
+from .translation_memo import translation_memo
+from .jobs import enqueue, PRIORITY_INTERACTIVE
+from .session_store import session_store, write_back, new_session_state, load_session_state
+from .ussd_menus import SCREENS, BACK_CHOICE, MORE_CHOICE, fit_screen
 
 router = APIRouter()
 
+def _search_resources(db: Session, term: str):
+    return search_resources(db, term, limit=MENU_MAX_RESOURCES)
+
+def _browse_menu(db: Session, session: dict):
+    return menu_cache.get_or_load(db, session["selected_subject"], session["selected_grade"])
+
+def _search_menu(db: Session, session: dict):
+    return menu_cache.search(db, session["search_term"], _search_resources)
+
+# Runtime content of the "list" screens
+LIST_MENUS = {
+    "browse_resources": _browse_menu,
+    "search_results": _search_menu,
+}
+
+def _selected_resource(db: Session, session: dict):
+    return db.query(models.Resource).filter(
+        models.Resource.id == session["selected_resource_id"]
+    ).first()
+
+def view_summary(db: Session, session: dict) -> str:
+    # Summaries are precomputed after approval; this is a single lookup
+    summary = db.query(models.Summary.summary_text).filter(
+        models.Summary.resource_id == session["selected_resource_id"],
+        models.Summary.language == "en"
+    ).first()
+    if summary is None:
+        resource = _selected_resource(db, session)
+        if resource is None:
+            return "END Resource not found."
+        # Not summarized yet; never summarize on a USSD hop
+        enqueue(db, "summarize_resource", {"resource_id": resource.id, "language": "en"},
+                priority=PRIORITY_INTERACTIVE, dedupe=True)
+        return "END The summary is being prepared. Please dial again in a minute."
+    return fit_screen(f"END Summary: {summary.summary_text}")
+
+def send_sms_link(db: Session, session: dict) -> str:
+    resource = _selected_resource(db, session)
+    if resource is None:
+        return "END Resource not found."
+    # In a real implementation, integrate with SMS gateway
+    return "END SMS with resource link will be sent shortly."
+
+def translate_title(db: Session, session: dict) -> str:
+    resource = _selected_resource(db, session)
+    if resource is None:
+        return "END Resource not found."
+    translated_title = translation_memo.lookup(db, resource.title, session["target_language"], resource.language or "en")
+    if translated_title is None:
+        enqueue(db, "translate_resource", {"resource_id": resource.id, "language": session["target_language"]},
+                priority=PRIORITY_INTERACTIVE, dedupe=True)
+        return "END The translation is being prepared. Please dial again in a minute."
+    return fit_screen(f"END Translated title: {translated_title}")
+
+# Handlers of the "action" screens
+ACTIONS = {
+    "view_summary": view_summary,
+    "sms_link": send_sms_link,
+    "translate": translate_title,
+}
+
+def _render(db: Session, session: dict) -> str:
+    """
+    The screen the session is currently on
+    """
+    screen = SCREENS[session["menu_level"]]
+    if screen.kind == "list":
+        return LIST_MENUS[screen.name](db, session).page_text(session["page"])
+    return screen.text
+
+def _enter(db: Session, session: dict, name: str, updates) -> str:
+    for field, value in updates:
+        session[field] = value
+    session["menu_level"] = name
+    screen = SCREENS[name]
+    if screen.kind == "action":
+        return ACTIONS[name](db, session)
+    return _render(db, session)
+
+def _dispatch(db: Session, session: dict, choice: str) -> str:
+    screen = SCREENS[session["menu_level"]]
+
+    if screen.kind == "menu":
+        transition = screen.transitions.get(choice)
+        if transition is None:
+            return screen.invalid_text
+        return _enter(db, session, *transition)
+
+    if screen.kind == "list":
+        menu = LIST_MENUS[screen.name](db, session)
+        page = session["page"]
+        if choice == BACK_CHOICE:
+            if page > 0:
+                session["page"] = page - 1
+                return menu.page_text(page - 1)
+            return _enter(db, session, *screen.back)
+        if choice == MORE_CHOICE and menu.has_next(page):
+            session["page"] = page + 1
+            return menu.page_text(page + 1)
+        index = menu.resource_at(page, choice)
+        if index is None:
+            return screen.invalid_text
+        session["selected_resource_id"] = menu.resource_ids[index]
+        session["menu_level"] = screen.select
+        return menu.option_screens[index]
+
+    if screen.kind == "input":
+        if not choice:
+            return screen.text
+        return _enter(db, session, "search_results", (("search_term", choice), ("page", 0)))
+
+    return screen.text
+
 @router.post("/ussd", response_model=schemas.USSDResponse)
-async def handle_ussd(request: schemas.USSDRequest, db: Session = Depends(get_db)):
+async def handle_ussd(request: schemas.USSDRequest, db: AsyncSession = Depends(get_async_db)):
+    # The gateway sends every input of the session joined by "*"; only the
+    # last one is new, the rest is already reflected in the session state
     text = request.text.strip()
-    parts = text.split('*') if text else []
+    depth = text.count("*") + 1 if text else 0
     phone_number = request.phoneNumber
     session_id = request.sessionId
-    
-    # Get or create USSD session
-    session = db.query(models.USSDSession).filter(
-        models.USSDSession.session_id == session_id
-    ).first()
-    
-    if not session:
-        session = models.USSDSession(
-            phone_number=phone_number,
-            session_id=session_id,
-            menu_level="main"
-        )
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-    
-    response_message = ""
-    
-    # Main menu
-    if session.menu_level == "main":
-        if not parts:
-            response_message = "CON Welcome to African LMS:\n1. Browse Subjects\n2. Search Resources\n3. My Account\n0. Exit"
-        else:
-            choice = parts[0]
-            if choice == "1":
-                session.menu_level = "browse_subjects"
-                db.commit()
-                response_message = "CON Select Subject:\n1. Mathematics\n2. Science\n3. Languages\n4. History\n5. Geography\n0. Back"
-            elif choice == "2":
-                session.menu_level = "search"
-                db.commit()
-                response_message = "CON Enter search term:"
-            elif choice == "3":
-                session.menu_level = "account"
-                db.commit()
-                response_message = "CON Account Options:\n1. Register\n2. Login\n0. Back"
-            elif choice == "0":
-                response_message = "END Thank you for using African LMS"
-            else:
-                response_message = "CON Invalid choice. Try again:\n1. Browse Subjects\n2. Search Resources\n3. My Account\n0. Exit"
-    
-    # Browse subjects
-    elif session.menu_level == "browse_subjects":
-        if len(parts) < 2:
-            response_message = "CON Select Subject:\n1. Mathematics\n2. Science\n3. Languages\n4. History\n5. Geography\n0. Back"
-        else:
-            choice = parts[1]
-            subject_map = {
-                "1": "Mathematics",
-                "2": "Science",
-                "3": "Languages",
-                "4": "History",
-                "5": "Geography"
-            }
-            
-            if choice == "0":
-                session.menu_level = "main"
-                db.commit()
-                response_message = "CON Welcome to African LMS:\n1. Browse Subjects\n2. Search Resources\n3. My Account\n0. Exit"
-            elif choice in subject_map:
-                session.selected_subject = subject_map[choice]
-                session.menu_level = "select_grade"
-                db.commit()
-                response_message = "CON Select Grade Level:\n1. Primary\n2. Secondary\n3. University\n0. Back"
-            else:
-                response_message = "CON Invalid choice. Try again:\n1. Mathematics\n2. Science\n3. Languages\n4. History\n5. Geography\n0. Back"
-    
-    # Select grade level
-    elif session.menu_level == "select_grade":
-        if len(parts) < 3:
-            response_message = "CON Select Grade Level:\n1. Primary\n2. Secondary\n3. University\n0. Back"
-        else:
-            choice = parts[2]
-            grade_map = {
-                "1": "Primary",
-                "2": "Secondary",
-                "3": "University"
-            }
-            
-            if choice == "0":
-                session.menu_level = "browse_subjects"
-                session.selected_subject = None
-                db.commit()
-                response_message = "CON Select Subject:\n1. Mathematics\n2. Science\n3. Languages\n4. History\n5. Geography\n0. Back"
-            elif choice in grade_map:
-                session.selected_grade = grade_map[choice]
-                session.menu_level = "browse_resources"
-                db.commit()
-                
-                # Get resources for selected subject and grade
-                resources = db.query(models.Resource).filter(
-                    models.Resource.subject == session.selected_subject,
-                    models.Resource.grade_level == session.selected_grade,
-                    models.Resource.is_approved == True
-                ).limit(5).all()
-                
-                if resources:
-                    options = "\n".join([f"{i+1}. {r.title}" for i, r in enumerate(resources)])
-                    response_message = f"CON Select Resource:\n{options}\n0. Back"
-                else:
-                    response_message = "CON No resources found for this criteria.\n0. Back"
-            else:
-                response_message = "CON Invalid choice. Try again:\n1. Primary\n2. Secondary\n3. University\n0. Back"
-    
-    # Browse resources
-    elif session.menu_level == "browse_resources":
-        if len(parts) < 4:
-            # This shouldn't happen normally, but handle it
-            response_message = "CON Select Resource:\n0. Back"
-        else:
-            choice = parts[3]
-            
-            if choice == "0":
-                session.menu_level = "select_grade"
-                session.selected_grade = None
-                db.commit()
-                response_message = "CON Select Grade Level:\n1. Primary\n2. Secondary\n3. University\n0. Back"
-            else:
-                # Get resources again
-                resources = db.query(models.Resource).filter(
-                    models.Resource.subject == session.selected_subject,
-                    models.Resource.grade_level == session.selected_grade,
-                    models.Resource.is_approved == True
-                ).limit(5).all()
-                
-                try:
-                    index = int(choice) - 1
-                    if 0 <= index < len(resources):
-                        resource = resources[index]
-                        session.selected_resource_id = resource.id
-                        session.menu_level = "resource_options"
-                        db.commit()
-                        
-                        response_message = f"CON {resource.title}:\n1. View Summary\n2. Get SMS Link\n3. Translate\n0. Back"
-                    else:
-                        response_message = "CON Invalid choice. Try again:\n0. Back"
-                except ValueError:
-                    response_message = "CON Invalid choice. Try again:\n0. Back"
-    
-    # Resource options
-    elif session.menu_level == "resource_options":
-        if len(parts) < 5:
-            response_message = f"CON Resource Options:\n1. View Summary\n2. Get SMS Link\n3. Translate\n0. Back"
-        else:
-            choice = parts[4]
-            
-            if choice == "0":
-                session.menu_level = "browse_resources"
-                session.selected_resource_id = None
-                db.commit()
-                
-                # Get resources again
-                resources = db.query(models.Resource).filter(
-                    models.Resource.subject == session.selected_subject,
-                    models.Resource.grade_level == session.selected_grade,
-                    models.Resource.is_approved == True
-                ).limit(5).all()
-                
-                if resources:
-                    options = "\n".join([f"{i+1}. {r.title}" for i, r in enumerate(resources)])
-                    response_message = f"CON Select Resource:\n{options}\n0. Back"
-                else:
-                    response_message = "CON No resources found.\n0. Back"
-            elif choice == "1":
-                # View summary
-                resource = db.query(models.Resource).filter(
-                    models.Resource.id == session.selected_resource_id
-                ).first()
-                
-                if resource:
-                    summary = ai_services.summarize_text(resource.description or resource.title)
-                    response_message = f"END Summary: {summary}"
-                else:
-                    response_message = "END Resource not found."
-            elif choice == "2":
-                # Get SMS link (in a real implementation, this would send an SMS)
-                resource = db.query(models.Resource).filter(
-                    models.Resource.id == session.selected_resource_id
-                ).first()
-                
-                if resource:
-                    # In a real implementation, integrate with SMS gateway
-                    response_message = "END SMS with resource link will be sent shortly."
-                else:
-                    response_message = "END Resource not found."
-            elif choice == "3":
-                session.menu_level = "select_translation_language"
-                db.commit()
-                response_message = "CON Select Language:\n1. Swahili\n2. Hausa\n3. Yoruba\n4. Zulu\n5. Amharic\n0. Back"
-            else:
-                response_message = "CON Invalid choice. Try again:\n1. View Summary\n2. Get SMS Link\n3. Translate\n0. Back"
-    
-    # Select translation language
-    elif session.menu_level == "select_translation_language":
-        if len(parts) < 6:
-            response_message = "CON Select Language:\n1. Swahili\n2. Hausa\n3. Yoruba\n4. Zulu\n5. Amharic\n0. Back"
-        else:
-            choice = parts[5]
-            language_map = {
-                "1": "sw",
-                "2": "ha",
-                "3": "yo",
-                "4": "zu",
-                "5": "am"
-            }
-            
-            if choice == "0":
-                session.menu_level = "resource_options"
-                db.commit()
-                response_message = f"CON Resource Options:\n1. View Summary\n2. Get SMS Link\n3. Translate\n0. Back"
-            elif choice in language_map:
-                target_language = language_map[choice]
-                resource = db.query(models.Resource).filter(
-                    models.Resource.id == session.selected_resource_id
-                ).first()
-                
-                if resource:
-                    translated_title = ai_services.translate_text(
-                        resource.title, target_language
-                    )
-                    response_message = f"END Translated title: {translated_title}"
-                else:
-                    response_message = "END Resource not found."
-            else:
-                response_message = "CON Invalid choice. Try again:\n1. Swahili\n2. Hausa\n3. Yoruba\n4. Zulu\n5. Amharic\n0. Back"
-    
-    # Search resources
-    elif session.menu_level == "search":
-        if len(parts) < 2:
-            response_message = "CON Enter search term:"
-        else:
-            search_term = parts[1]
-            resources = db.query(models.Resource).filter(
-                (models.Resource.title.ilike(f"%{search_term}%")) |
-                (models.Resource.description.ilike(f"%{search_term}%")) |
-                (models.Resource.tags.ilike(f"%{search_term}%")),
-                models.Resource.is_approved == True
-            ).limit(5).all()
-            
-            if resources:
-                options = "\n".join([f"{i+1}. {r.title} ({r.subject})" for i, r in enumerate(resources)])
-                response_message = f"CON Search Results:\n{options}\n0. Back"
-                
-                # Store the search results in session for later use
-                session.menu_level = "search_results"
-                db.commit()
-            else:
-                response_message = "CON No resources found.\n0. Back"
-                session.menu_level = "main"
-                db.commit()
-    
-    # Handle search results
-    elif session.menu_level == "search_results":
-        # Similar to browse_resources handling
-        # Implementation would be similar to the browse_resources section
-        response_message = "CON Search results functionality would be implemented here.\n0. Back"
-    
-    # Account management
-    elif session.menu_level == "account":
-        # Implementation for user registration and login
-        response_message = "CON Account management would be implemented here.\n0. Back"
-    
-    return schemas.USSDResponse(message=response_message)
\ No newline at end of file
+
+    # Get session state from the store, recovering it from the database only
+    # when the gateway is already mid-session. Database work goes through
+    # run_sync on the async session, so it never blocks the event loop.
+    session = session_store.get(session_id) if depth else None
+    if session is None and depth:
+        session = await db.run_sync(load_session_state, session_id)
+        if session and SCREENS.get(session["menu_level"]) is None:
+            session = None
+    if session is None:
+        session = new_session_state(session_id, phone_number)
+
+    if depth > session["depth"]:
+        response_message = await db.run_sync(_dispatch, session, text.rpartition("*")[2])
+        session["depth"] = depth
+    else:
+        # First hop, or the gateway retrying a hop we already handled
+        response_message = await db.run_sync(_render, session)
+
+    # Finished sessions are written back for audit, live ones stay in the store
+    if response_message.startswith("END"):
+        session_store.end(session_id)
+        write_back.schedule(session)
+    else:
+        session_store.put(session_id, session)
+
+    return schemas.USSDResponse(message=response_message)
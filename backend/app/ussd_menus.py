@@ -0,0 +1,243 @@
+# backend/app/ussd_menus.py
+# Declarative USSD menu graph, compiled once at import time into a dispatch
+# table of pre-rendered screens
+USSD_MAX_LENGTH = 182
+BACK_CHOICE = "0"
+MORE_CHOICE = "98"
+MAX_PAGE_OPTIONS = 9
+
+# Screen kinds:
+#   menu    - fixed options, each leading to another screen
+#   list    - paged list of resources, provided at runtime
+#   input   - free text entered by the user
+#   action  - runs a handler and ends the session with its result
+#   end     - ends the session with a fixed message
+# An option target is a screen name, or (screen name, session fields to set).
+MENU_GRAPH = {
+    "main": {
+        "kind": "menu",
+        "title": "Welcome to African LMS:",
+        "options": [
+            ("1", "Browse Subjects", "browse_subjects"),
+            ("2", "Search Resources", "search"),
+            ("3", "My Account", "account"),
+            ("0", "Exit", "exit"),
+        ],
+    },
+    "browse_subjects": {
+        "kind": "menu",
+        "title": "Select Subject:",
+        "options": [
+            ("1", "Mathematics", ("select_grade", {"selected_subject": "Mathematics"})),
+            ("2", "Science", ("select_grade", {"selected_subject": "Science"})),
+            ("3", "Languages", ("select_grade", {"selected_subject": "Languages"})),
+            ("4", "History", ("select_grade", {"selected_subject": "History"})),
+            ("5", "Geography", ("select_grade", {"selected_subject": "Geography"})),
+            ("0", "Back", ("main", {"selected_subject": None})),
+        ],
+    },
+    "select_grade": {
+        "kind": "menu",
+        "title": "Select Grade Level:",
+        "options": [
+            ("1", "Primary", ("browse_resources", {"selected_grade": "Primary", "page": 0})),
+            ("2", "Secondary", ("browse_resources", {"selected_grade": "Secondary", "page": 0})),
+            ("3", "University", ("browse_resources", {"selected_grade": "University", "page": 0})),
+            ("0", "Back", ("browse_subjects", {"selected_subject": None})),
+        ],
+    },
+    "browse_resources": {
+        "kind": "list",
+        "select": "resource_options",
+        "back": ("select_grade", {"selected_grade": None, "page": 0}),
+    },
+    "search": {
+        "kind": "input",
+        "title": "Enter search term:",
+    },
+    "search_results": {
+        "kind": "list",
+        "select": "search_result_options",
+        "back": ("main", {"search_term": None, "page": 0}),
+    },
+    "account": {
+        "kind": "menu",
+        "title": "Account Options:",
+        "options": [
+            ("1", "Register", "account_pending"),
+            ("2", "Login", "account_pending"),
+            ("0", "Back", "main"),
+        ],
+    },
+    "account_pending": {
+        "kind": "menu",
+        "title": "Account management would be implemented here.",
+        "options": [
+            ("0", "Back", "account"),
+        ],
+    },
+    "view_summary": {"kind": "action"},
+    "sms_link": {"kind": "action"},
+    "translate": {"kind": "action"},
+    "exit": {
+        "kind": "end",
+        "title": "Thank you for using African LMS",
+    },
+}
+
+def _resource_menus(options_screen: str, languages_screen: str, back):
+    """
+    The options and translation screens shown for a selected resource
+    """
+    return {
+        options_screen: {
+            "kind": "menu",
+            "title": "Resource Options:",
+            "options": [
+                ("1", "View Summary", "view_summary"),
+                ("2", "Get SMS Link", "sms_link"),
+                ("3", "Translate", languages_screen),
+                ("0", "Back", back),
+            ],
+        },
+        languages_screen: {
+            "kind": "menu",
+            "title": "Select Language:",
+            "options": [
+                ("1", "Swahili", ("translate", {"target_language": "sw"})),
+                ("2", "Hausa", ("translate", {"target_language": "ha"})),
+                ("3", "Yoruba", ("translate", {"target_language": "yo"})),
+                ("4", "Zulu", ("translate", {"target_language": "zu"})),
+                ("5", "Amharic", ("translate", {"target_language": "am"})),
+                ("0", "Back", options_screen),
+            ],
+        },
+    }
+
+MENU_GRAPH.update(_resource_menus(
+    "resource_options", "select_translation_language",
+    ("browse_resources", {"selected_resource_id": None})
+))
+MENU_GRAPH.update(_resource_menus(
+    "search_result_options", "search_translation_language",
+    ("search_results", {"selected_resource_id": None})
+))
+
+def truncate(text: str, length: int) -> str:
+    if len(text) <= length:
+        return text
+    return text[:max(length - 3, 0)] + "..."
+
+def fit_screen(text: str) -> str:
+    """
+    Cut a dynamic screen (e.g. a summary) down to the USSD limit
+    """
+    return truncate(text, USSD_MAX_LENGTH)
+
+def _render_options(labels) -> str:
+    return "\n".join([f"{choice}. {label}" for choice, label in labels])
+
+def render_menu(title: str, labels) -> str:
+    return f"CON {title}\n{_render_options(labels)}"
+
+def render_options_screen(title: str, screen: str = "resource_options") -> str:
+    """
+    The options screen of a single resource, headed by its title
+    """
+    options = _render_options([(choice, label) for choice, label, _ in MENU_GRAPH[screen]["options"]])
+    room = USSD_MAX_LENGTH - len("CON :\n") - len(options)
+    return f"CON {truncate(title, room)}:\n{options}"
+
+def paginate(header: str, labels, empty_text: str):
+    """
+    Pack labels into as few screens as fit the USSD limit. Each page is
+    (text, index of its first label, number of labels).
+    """
+    if not labels:
+        return [(f"CON {empty_text}\n{BACK_CHOICE}. Back", 0, 0)]
+
+    footer_more = f"\n{MORE_CHOICE}. More\n{BACK_CHOICE}. Back"
+    footer_last = f"\n{BACK_CHOICE}. Back"
+    head = f"CON {header}"
+    # Longest label that still fits alone on a page with a "More" footer
+    room = USSD_MAX_LENGTH - len(head) - len(footer_more) - len("\n9. ")
+
+    pages = []
+    start = 0
+    while start < len(labels):
+        lines = []
+        length = len(head)
+        index = start
+        while index < len(labels) and len(lines) < MAX_PAGE_OPTIONS:
+            line = f"\n{len(lines) + 1}. {truncate(labels[index], room)}"
+            last = index + 1 == len(labels)
+            footer = footer_last if last else footer_more
+            if lines and length + len(line) + len(footer) > USSD_MAX_LENGTH:
+                break
+            lines.append(line)
+            length += len(line)
+            index += 1
+        footer = footer_last if index == len(labels) else footer_more
+        pages.append((head + "".join(lines) + footer, start, index - start))
+        start = index
+    return pages
+
+class Screen:
+    __slots__ = ("name", "kind", "text", "invalid_text", "transitions", "select", "back")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.text = None
+        self.invalid_text = None
+        self.transitions = {}
+        self.select = None
+        self.back = None
+
+def _target(target):
+    if isinstance(target, tuple):
+        name, updates = target
+        return name, tuple(updates.items())
+    return target, ()
+
+def compile_menu(graph=MENU_GRAPH):
+    """
+    Compile the graph into {screen name: Screen}. Every transition is resolved
+    and every fixed screen rendered here, so a hop is only dictionary lookups.
+    """
+    screens = {}
+    for name, spec in graph.items():
+        screen = Screen(name, spec["kind"])
+        if screen.kind == "menu":
+            labels = [(choice, label) for choice, label, _ in spec["options"]]
+            screen.text = render_menu(spec["title"], labels)
+            screen.invalid_text = render_menu("Invalid choice. Try again:", labels)
+            screen.transitions = {choice: _target(target) for choice, _, target in spec["options"]}
+        elif screen.kind == "input":
+            screen.text = f"CON {spec['title']}"
+        elif screen.kind == "action":
+            # Reached only through a transition, which runs the action
+            screen.text = "END Thank you for using African LMS"
+        elif screen.kind == "end":
+            screen.text = f"END {spec['title']}"
+        elif screen.kind == "list":
+            screen.select = spec["select"]
+            screen.back = _target(spec["back"])
+            screen.invalid_text = f"CON Invalid choice. Try again:\n{BACK_CHOICE}. Back"
+        screens[name] = screen
+
+    for screen in screens.values():
+        targets = list(screen.transitions.values())
+        if screen.back:
+            targets.append(screen.back)
+        for target, _ in targets:
+            if target not in screens:
+                raise ValueError(f"USSD screen {screen.name!r} leads to unknown screen {target!r}")
+        if screen.select and screen.select not in screens:
+            raise ValueError(f"USSD screen {screen.name!r} selects into unknown screen {screen.select!r}")
+        for text in (screen.text, screen.invalid_text):
+            if text and len(text) > USSD_MAX_LENGTH:
+                raise ValueError(f"USSD screen {screen.name!r} is longer than {USSD_MAX_LENGTH} characters")
+    return screens
+
+SCREENS = compile_menu()
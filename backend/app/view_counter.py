@@ -0,0 +1,105 @@
+# backend/app/view_counter.py
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from sqlalchemy import case, update
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# At most this many seconds or increments are lost if the process dies
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+VIEW_MAX_PENDING = int(os.getenv("VIEW_MAX_PENDING", "10000"))
+
+class ViewCounter:
+    """
+    Buffers view count increments per resource and writes them with one
+    batched UPDATE, periodically, when too many are pending, and on shutdown.
+    """
+
+    def __init__(self, interval: float = VIEW_FLUSH_INTERVAL, max_pending: int = VIEW_MAX_PENDING):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._counts = defaultdict(int)  # resource_id -> buffered increments
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def increment(self, resource_id: int, count: int = 1):
+        with self._lock:
+            self._counts[resource_id] += count
+            self._pending += count
+            full = self._pending >= self.max_pending
+        if self._thread is None:
+            self._start()
+        if full:
+            self._wake.set()
+
+    def pending(self) -> int:
+        """
+        Increments not yet written to the database
+        """
+        return self._pending
+
+    def pending_for(self, resource_id: int) -> int:
+        return self._counts.get(resource_id, 0)
+
+    def flush(self) -> int:
+        """
+        Write all buffered increments; returns how many were written
+        """
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(int)
+            pending, self._pending = self._pending, 0
+        if not counts:
+            return 0
+
+        db = SessionLocal()
+        try:
+            # UPDATE resources SET view_count = view_count + CASE id WHEN .. THEN .. END WHERE id IN (..)
+            db.execute(
+                update(models.Resource)
+                .where(models.Resource.id.in_(list(counts)))
+                .values(view_count=models.Resource.view_count + case(counts, value=models.Resource.id))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to flush %d view count increments", pending)
+            # Keep them for the next attempt
+            with self._lock:
+                for resource_id, count in counts.items():
+                    self._counts[resource_id] += count
+                self._pending += pending
+            return 0
+        finally:
+            db.close()
+        return pending
+
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped:
+                self.flush()
+
+# Global instance
+view_counter = ViewCounter()
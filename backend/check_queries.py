@@ -0,0 +1,91 @@
+# backend/check_queries.py
+from app import models
+from app.database import SessionLocal, engine
+from app.query_counter import count_queries, full_scans
+from app.resource_detail import DETAIL_QUERIES, get_resource_detail, query_details, detail_items
+
+# Check, reading only, that the hot queries stay cheap on this database:
+# resource details load in a fixed number of queries, and none of the main
+# queries needs a full table scan. tests/test_resource_detail.py checks the
+# query counts without a database of your own.
+
+def check_detail_queries(db) -> bool:
+    resource_id = db.query(models.Resource.id).filter(models.Resource.is_approved == True).order_by(
+        models.Resource.rating_count.desc(), models.Resource.id
+    ).limit(1).scalar()
+    if resource_id is None:
+        print("detail: no approved resources to load, query counts not checked: FAILED")
+        return False
+
+    ok = True
+    checks = [
+        ("detail", lambda: [get_resource_detail(db, resource_id)]),
+        ("expanded listing", lambda: query_details(db).filter(
+            models.Resource.is_approved == True
+        ).order_by(models.Resource.id).limit(100).all()),
+    ]
+    for name, load in checks:
+        db.expunge_all()
+        with count_queries(engine) as counter:
+            items = detail_items(load())
+        passed = counter.count <= DETAIL_QUERIES
+        ok = ok and passed
+        print(f"{name}: {len(items)} resources in {counter.count} queries (at most {DETAIL_QUERIES}): {'ok' if passed else 'FAILED'}")
+        if not passed:
+            for statement in counter.statements:
+                print(f"  {statement}")
+    return ok
+
+def check_query_plans(db) -> bool:
+    approved = db.query(models.Resource).filter(models.Resource.is_approved == True)
+    hot_queries = [
+        ("listing", approved.order_by(models.Resource.id).limit(100)),
+        ("listing by subject", approved.filter(models.Resource.subject == "Mathematics").order_by(models.Resource.id).limit(100)),
+        ("listing by grade", approved.filter(models.Resource.grade_level == "Grade 5").order_by(models.Resource.id).limit(100)),
+        ("listing by country", approved.filter(models.Resource.country == "Kenya").order_by(models.Resource.id).limit(100)),
+        ("listing by language", approved.filter(models.Resource.language == "sw").order_by(models.Resource.id).limit(100)),
+        ("sort=rating", approved.order_by(models.Resource.rating_average.desc(), models.Resource.id.desc()).limit(100)),
+        ("sort=popular", approved.order_by(models.Resource.view_count.desc(), models.Resource.id.desc()).limit(100)),
+        ("USSD menu", db.query(models.Resource.id, models.Resource.title).filter(
+            models.Resource.subject == "Mathematics",
+            models.Resource.grade_level == "Grade 5",
+            models.Resource.is_approved == True
+        ).order_by(models.Resource.id).limit(9)),
+        ("catalogue bundle", approved.filter(
+            models.Resource.country == "Kenya",
+            models.Resource.grade_level == "Grade 5",
+            models.Resource.language == "en"
+        ).order_by(models.Resource.id)),
+        ("translations of a resource", db.query(models.Translation).filter(models.Translation.resource_id == 1)),
+        ("translation in a language", db.query(models.Translation).filter(
+            models.Translation.resource_id == 1, models.Translation.language == "sw"
+        )),
+        ("ratings of a resource", db.query(models.Rating).filter(models.Rating.resource_id == 1)),
+        ("summary", db.query(models.Summary.summary_text).filter(
+            models.Summary.resource_id == 1, models.Summary.language == "en"
+        )),
+        ("USSD session", db.query(models.USSDSession).filter(models.USSDSession.session_id == "session")),
+        ("user by phone", db.query(models.User).filter(models.User.phone_number == "+254700000000")),
+        ("change feed", db.query(models.ChangeLog).filter(models.ChangeLog.seq > 0).order_by(models.ChangeLog.seq).limit(500)),
+    ]
+    ok = True
+    connection = db.connection()
+    for name, query in hot_queries:
+        scans = full_scans(connection, query.statement)
+        ok = ok and not scans
+        print(f"{name}: {'full scan of ' + ', '.join(scans) + ': FAILED' if scans else 'ok'}")
+    return ok
+
+def main():
+    db = SessionLocal()
+    try:
+        # Both run, so one report shows every problem
+        details_ok = check_detail_queries(db)
+        plans_ok = check_query_plans(db)
+    finally:
+        db.close()
+    if not (details_ok and plans_ok):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
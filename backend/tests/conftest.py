@@ -0,0 +1,62 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+
+import pytest
+
+# A throwaway SQLite database and file stores, set before app.database
+# creates its engine
+TEST_ROOT = tempfile.mkdtemp(prefix="african_lms_tests_")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(TEST_ROOT, "test.db"))
+os.environ.setdefault("BLOB_ROOT", os.path.join(TEST_ROOT, "blobs"))
+os.environ.setdefault("TTS_ROOT", os.path.join(TEST_ROOT, "audio"))
+os.environ.setdefault("BUNDLE_ROOT", os.path.join(TEST_ROOT, "bundles"))
+
+# The app package and the scripts next to it import from backend/
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app import models, migrations
+from app.database import Base, SessionLocal, engine
+
+Base.metadata.create_all(bind=engine)
+migrations.migrate(engine)
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+@pytest.fixture
+def catalogue(db):
+    """
+    A teacher, a student and three approved resources, each with a
+    translation and a rating
+    """
+    teacher = models.User(username="teacher", email="teacher@example.com", password_hash="x", role=models.UserRole.teacher)
+    student = models.User(username="student", email="student@example.com", password_hash="x")
+    db.add_all([teacher, student])
+    db.flush()
+    resources = [
+        models.Resource(
+            title=f"Fractions {number}", description="Adding fractions", file_type=models.FileType.text,
+            subject="Mathematics", grade_level="Grade 5", country="Kenya", language="en",
+            uploaded_by=teacher.id, is_approved=True
+        )
+        for number in range(3)
+    ]
+    db.add_all(resources)
+    db.flush()
+    for resource in resources:
+        db.add(models.Translation(resource_id=resource.id, language="sw", translated_title=f"Sehemu {resource.id}"))
+        db.add(models.Rating(resource_id=resource.id, user_id=student.id, rating=4))
+    db.commit()
+    return resources
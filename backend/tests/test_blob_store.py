@@ -0,0 +1,76 @@
+# backend/tests/test_blob_store.py
+import io
+import os
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app import models
+from app.blob_store import UploadLimitMiddleware, blob_store
+
+def test_chunked_upload_is_cut_off_at_the_limit():
+    uploads = []
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1000)
+
+    @app.post("/upload")
+    def upload(file: UploadFile = File(...)):
+        uploads.append(file.filename)
+        return {}
+
+    sent = []
+
+    def body():
+        # No Content-Length: the size is only known by counting
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="big.pdf"\r\n\r\n'
+        for _ in range(100):
+            sent.append(1)
+            yield b"x" * 100
+        yield b"\r\n--b--\r\n"
+
+    response = TestClient(app).post(
+        "/upload", data=body(), headers={"Content-Type": "multipart/form-data; boundary=b"}
+    )
+    assert response.status_code == 413
+    assert uploads == []
+    assert len(sent) < 100
+
+def _resource(db, user_id, file_hash):
+    resource = models.Resource(
+        title="Worksheet", file_type=models.FileType.pdf, subject="Mathematics", grade_level="Grade 5",
+        country="Kenya", uploaded_by=user_id, file_hash=file_hash
+    )
+    db.add(resource)
+    return resource
+
+def _blob(db, digest):
+    return db.query(models.Blob).filter(models.Blob.sha256 == digest).first()
+
+def test_deleting_the_last_resource_frees_the_file(db, catalogue):
+    digest, path, _ = blob_store.put(db, io.BytesIO(b"worksheet"))
+    first = _resource(db, catalogue[0].uploaded_by, digest)
+    digest, path, _ = blob_store.put(db, io.BytesIO(b"worksheet"))
+    second = _resource(db, catalogue[0].uploaded_by, digest)
+    db.commit()
+    assert _blob(db, digest).ref_count == 2
+
+    db.delete(first)
+    db.commit()
+    db.expire_all()
+    assert _blob(db, digest).ref_count == 1 and os.path.exists(path)
+
+    db.delete(second)
+    db.commit()
+    assert _blob(db, digest) is None and not os.path.exists(path)
+
+def test_replacing_the_file_releases_the_old_one(db, catalogue):
+    old_digest, old_path, _ = blob_store.put(db, io.BytesIO(b"first draft"))
+    resource = _resource(db, catalogue[0].uploaded_by, old_digest)
+    db.commit()
+
+    new_digest, _, _ = blob_store.put(db, io.BytesIO(b"second draft"))
+    resource.file_hash = new_digest
+    db.commit()
+
+    assert _blob(db, old_digest) is None and not os.path.exists(old_path)
+    assert _blob(db, new_digest).ref_count == 1
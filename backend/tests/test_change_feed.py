@@ -0,0 +1,80 @@
+# backend/tests/test_change_feed.py
+from datetime import datetime
+
+from app import change_feed, models
+from app.database import SessionLocal
+
+def _log(db):
+    return {
+        (entry.entity, entry.entity_id): entry.resource_id
+        for entry in db.query(models.ChangeLog).all()
+    }
+
+def test_backfill_logs_unlogged_rows(db, catalogue):
+    # As if the rows predated the log
+    db.query(models.ChangeLog).delete()
+    db.commit()
+
+    change_feed.backfill(db)
+
+    expected = {("resource", resource.id): resource.id for resource in catalogue}
+    for translation in db.query(models.Translation).all():
+        expected[("translation", translation.id)] = translation.resource_id
+    for rating in db.query(models.Rating).all():
+        expected[("rating", rating.id)] = rating.resource_id
+    assert _log(db) == expected
+
+def test_backfill_skips_logged_rows(db, catalogue):
+    count = db.query(models.ChangeLog).count()
+    change_feed.backfill(db)
+    assert db.query(models.ChangeLog).count() == count
+
+def test_record_changes_logs_resources(db, catalogue):
+    db.query(models.ChangeLog).delete()
+    change_feed.record_changes(db, "resource", [catalogue[0].id], op="delete")
+    db.commit()
+
+    entry = db.query(models.ChangeLog).one()
+    assert (entry.entity, entry.entity_id, entry.resource_id, entry.op) == (
+        "resource", catalogue[0].id, catalogue[0].id, "delete"
+    )
+
+def test_record_resources_since(db, catalogue):
+    db.query(models.ChangeLog).delete()
+    change_feed.record_resources_since(db, catalogue[0].id, catalogue[0].uploaded_by)
+    db.commit()
+
+    assert _log(db) == {("resource", resource.id): resource.id for resource in catalogue[1:]}
+
+def test_feed_serves_committed_entries_in_commit_order(db, catalogue):
+    feed = change_feed.changes_since(db, 0)
+    assert feed["resources"] and not feed["has_more"]
+
+    other = SessionLocal()
+    change_feed.record_changes(other, "resource", [catalogue[1].id])
+    other.flush()
+    # Not committed yet: not served, and the cursor does not move past it
+    assert change_feed.changes_since(db, feed["cursor"])["cursor"] == feed["cursor"]
+    other.commit()
+    other.close()
+
+    later = change_feed.changes_since(db, feed["cursor"])
+    assert [resource.id for resource in later["resources"]] == [catalogue[1].id]
+
+def test_late_commit_with_lower_ids_is_not_skipped(db, catalogue):
+    cursor = change_feed.changes_since(db, 0)["cursor"]
+    # An entry whose id was taken before every served one, as by a long
+    # import, committing only now
+    first = db.query(models.ChangeLog).order_by(models.ChangeLog.id).first()
+    entry_id = first.id
+    db.delete(first)
+    db.commit()
+    db.add(models.ChangeLog(
+        id=entry_id, entity="resource", entity_id=catalogue[2].id, resource_id=catalogue[2].id,
+        op="upsert", changed_at=datetime.utcnow(), txn=change_feed._token(db)
+    ))
+    db.commit()
+
+    feed = change_feed.changes_since(db, cursor)
+    assert [resource.id for resource in feed["resources"]] == [catalogue[2].id]
+    assert feed["cursor"] > cursor
@@ -0,0 +1,37 @@
+# backend/tests/test_downloads.py
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import downloads
+
+CONTENT = bytes(range(256)) * 1024
+
+def _client(path):
+    app = FastAPI()
+
+    @app.get("/file")
+    def get_file(request: Request):
+        return downloads.file_download(request, path, "abc123", "notes.pdf")
+
+    return TestClient(app)
+
+def test_range_returns_only_those_bytes(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(CONTENT)
+    response = _client(str(path)).get("/file", headers={"Range": "bytes=100000-100099"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100000-100099/{len(CONTENT)}"
+    assert response.headers["content-length"] == "100"
+    assert response.content == CONTENT[100000:100100]
+
+def test_accel_path_keeps_leading_dots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(".cache")
+    with open(os.path.join(".cache", "blob"), "wb") as f:
+        f.write(CONTENT)
+    monkeypatch.setattr(downloads, "DOWNLOAD_ACCEL_PREFIX", "/protected/")
+    response = _client("./.cache/blob").get("/file", headers={"Range": "bytes=0-9"})
+    assert response.headers["x-accel-redirect"] == "/protected/.cache/blob"
+    assert response.content == b""
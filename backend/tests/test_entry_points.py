@@ -0,0 +1,26 @@
+# backend/tests/test_entry_points.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+def test_apps_import():
+    import app
+    import app.main
+
+    paths = {route.path for route in app.app.routes}
+    assert "/api/v1/resources/" in paths and "/api/v1/ussd" in paths
+    assert "/api/v1/resources/" in {route.path for route in app.main.app.routes}
+
+@pytest.mark.parametrize("module", ["app.jobs", "app.migrations", "app.catalogue_import", "app.session_store"])
+def test_command_line_entry_points_start(module):
+    # Run as the docs say, from backend/, against the test database
+    result = subprocess.run(
+        [sys.executable, "-m", module, "--help"],
+        cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("usage:")
@@ -0,0 +1,11 @@
+# backend/tests/test_http_cache.py
+from app.http_cache import choose_encoding
+
+def test_zero_weights_refuse_an_encoding():
+    assert choose_encoding("gzip;q=0.0") is None
+    assert choose_encoding("gzip; q=0.000, identity") is None
+    assert choose_encoding("gzip;q=bogus") is None
+
+def test_weighted_encodings_are_accepted():
+    assert choose_encoding("gzip;q=0.5, identity;q=1") == "gzip"
+    assert choose_encoding("deflate, GZIP") == "gzip"
@@ -0,0 +1,45 @@
+# backend/tests/test_jobs.py
+from datetime import datetime, timedelta
+
+from app import models
+from app.ai_services import ai_services
+from app.jobs import requeue_stale, translate_resource, JOB_LEASE
+from app.translation_memo import translation_memo
+
+def _running_job(db, attempts: int):
+    job = models.Job(
+        kind="build_bundles", payload="{}", status=models.JobStatus.running, attempts=attempts, max_attempts=3,
+        run_after=datetime.utcnow(), locked_by="worker", locked_at=datetime.utcnow() - timedelta(seconds=JOB_LEASE + 1)
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+def test_requeue_stale(db):
+    retried = _running_job(db, attempts=1)
+    exhausted = _running_job(db, attempts=3)
+
+    requeue_stale(db)
+    db.expire_all()
+
+    assert retried.status == models.JobStatus.queued and retried.locked_by is None
+    assert exhausted.status == models.JobStatus.failed and exhausted.locked_by is None
+
+def test_translations_are_memoized_from_the_resource_language(db, catalogue, monkeypatch):
+    calls = []
+
+    def translate_text(text, target_language, source_language="en"):
+        calls.append((source_language, target_language))
+        return f"{target_language}: {text}"
+
+    monkeypatch.setattr(ai_services, "translate_text", translate_text)
+    resource = catalogue[0]
+    resource.title, resource.description, resource.language = "Sehemu za hesabu", "Kujumlisha sehemu", "sw"
+    db.commit()
+
+    translate_resource(db, {"resource_id": resource.id, "language": "fr"})
+
+    assert calls == [("sw", "fr"), ("sw", "fr")]
+    assert translation_memo.lookup(db, "Sehemu za hesabu", "fr", "sw") == "fr: Sehemu za hesabu"
+    # Nothing is filed under English to French
+    assert translation_memo.lookup(db, "Sehemu za hesabu", "fr") is None
@@ -0,0 +1,21 @@
+# backend/tests/test_query_cache.py
+from types import SimpleNamespace
+
+from app.query_cache import QueryCache
+
+def test_exact_filters_keep_their_case():
+    cache = QueryCache()
+    cache.get_or_load("resources", {"subject": "Mathematics"}, lambda: ["Mathematics"])
+    assert cache.get_or_load("resources", {"subject": "mathematics"}, lambda: []) == []
+    assert cache.misses == 2
+
+def test_contains_filters_ignore_case():
+    cache = QueryCache()
+    cache.get_or_load("main_resources", {"subject": "Math"}, lambda: ["Mathematics"], contains=True)
+    assert cache.get_or_load("main_resources", {"subject": "math"}, lambda: [], contains=True) == ["Mathematics"]
+
+def test_change_drops_listings_of_any_case():
+    cache = QueryCache()
+    cache.get_or_load("resources", {"subject": "mathematics"}, lambda: [])
+    cache.resource_changed(SimpleNamespace(subject="Mathematics", grade_level="Grade 5", country="Kenya", language="en"))
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,55 @@
+# backend/tests/test_query_counter.py
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import mysql
+
+from app.query_counter import full_scans
+
+def _scans(sql, **kwargs):
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.exec_driver_sql("CREATE TABLE items (a INTEGER, b INTEGER, c TEXT)")
+        connection.exec_driver_sql("CREATE INDEX ix_items_ab ON items (a, b)")
+        return full_scans(connection, text(sql), **kwargs)
+
+def test_index_seek_is_not_a_scan():
+    assert _scans("SELECT c FROM items WHERE a = 1") == []
+
+def test_full_index_scans_are_flagged():
+    assert _scans("SELECT a, b FROM items WHERE b = 1") == ["items"]
+    assert _scans("SELECT c FROM items ORDER BY a, b") == ["items"]
+    assert _scans("SELECT c FROM items WHERE c = 'x'") == ["items"]
+
+def test_scan_past_a_usable_index_is_flagged():
+    # Unary + keeps SQLite from using ix_items_ab for a = 1
+    assert _scans("SELECT c FROM items WHERE +a = 1") == ["items"]
+
+def test_small_tables_may_be_scanned():
+    assert _scans("SELECT c FROM items WHERE c = 'x'", small_tables=("items",)) == []
+
+class ExplainRow:
+    def __init__(self, table, type, possible_keys):
+        self.table = table
+        self.type = type
+        self.possible_keys = possible_keys
+
+class MySQLConnection:
+    """
+    Answers EXPLAIN with fixed rows, as MySQL would
+    """
+    dialect = mysql.dialect()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def exec_driver_sql(self, sql):
+        assert sql.startswith("EXPLAIN ")
+        return self.rows
+
+def test_mysql_scan_with_an_ignored_index_is_flagged():
+    connection = MySQLConnection([
+        ExplainRow("resources", "ALL", "ix_resources_approved"),
+        ExplainRow("users", "index", "PRIMARY"),
+        ExplainRow("ratings", "ref", "ix_ratings_resource"),
+        ExplainRow("schema_migrations", "ALL", None),
+    ])
+    assert full_scans(connection, text("SELECT 1")) == ["resources", "users"]
@@ -0,0 +1,42 @@
+# backend/tests/test_ratings.py
+from app import models, schemas
+from app.database import SessionLocal
+from app.rating_stats import record_rating
+from app.routes import ratings
+
+def _totals(db, resource_id):
+    db.expire_all()
+    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).one()
+    return resource.rating_count, resource.rating_sum
+
+def test_bulk_replay_racing_a_first_rating_counts_it_once(db, catalogue, monkeypatch):
+    reader = models.User(username="reader", email="reader@example.com", password_hash="x")
+    db.add(reader)
+    db.commit()
+    resource_id = catalogue[0].id
+    count, total = _totals(db, resource_id)
+
+    rating_deltas = ratings.rating_deltas
+    raced = []
+
+    def replay_elsewhere_first(new, old=None):
+        # Another replay of the batch commits the same first rating after
+        # this one looked for it and found nothing
+        if not raced:
+            raced.append(True)
+            other = SessionLocal()
+            other.add(models.Rating(resource_id=resource_id, user_id=reader.id, rating=2))
+            record_rating(other, resource_id, 2)
+            other.commit()
+            other.close()
+        return rating_deltas(new, old)
+
+    monkeypatch.setattr(ratings, "rating_deltas", replay_elsewhere_first)
+    response = ratings.create_ratings_bulk(
+        schemas.RatingBulkRequest(ratings=[{"resource_id": resource_id, "rating": 5}]),
+        current_user=reader,
+        db=db
+    )
+
+    assert response.results[0].status == schemas.RatingBulkStatus.updated
+    assert _totals(db, resource_id) == (count + 1, total + 5)
@@ -0,0 +1,43 @@
+# backend/tests/test_resource_detail.py
+from app import models
+from app.database import engine
+from app.query_counter import count_queries
+from app.resource_detail import DETAIL_QUERIES, get_resource_detail, query_details, detail_items
+
+def _add_related(db, resources):
+    """
+    Audio and a summary for every resource and a second translation, then
+    a clean session; returns the resource ids
+    """
+    ids = [resource.id for resource in resources]
+    for resource in resources:
+        db.add(models.Translation(resource_id=resource.id, language="ha", translated_title="Juzu'i"))
+        db.add(models.TextToSpeech(resource_id=resource.id, language="en", audio_path=f"/audio/{resource.id}.wav"))
+        db.add(models.Summary(resource_id=resource.id, language="en", summary_text="Adding fractions."))
+    db.commit()
+    db.expunge_all()
+    return ids
+
+def test_detail_query_count(db, catalogue):
+    resource_id = _add_related(db, catalogue)[0]
+
+    with count_queries(engine) as counter:
+        items = detail_items([get_resource_detail(db, resource_id)])
+
+    assert counter.count <= DETAIL_QUERIES
+    item = items[0]
+    assert item.uploader.username == "teacher"
+    assert len(item.translations) == 2 and len(item.ratings) == 1
+    assert len(item.tts) == 1 and len(item.summaries) == 1
+
+def test_expanded_listing_query_count_does_not_grow(db, catalogue):
+    ids = _add_related(db, catalogue)
+
+    with count_queries(engine) as counter:
+        items = detail_items(query_details(db).filter(
+            models.Resource.is_approved == True
+        ).order_by(models.Resource.id).limit(100).all())
+
+    assert [item.id for item in items] == ids
+    assert counter.count <= DETAIL_QUERIES
+    assert all(len(item.translations) == 2 for item in items)
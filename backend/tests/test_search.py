@@ -0,0 +1,27 @@
+# backend/tests/test_search.py
+from app import models
+from app.catalogue import resource_sort_keys
+from app.database import engine
+from app.pagination import keyset_page
+from app.search import search_index, search_page, search_filter
+
+def test_search_pages_by_cursor(db, catalogue):
+    search_index.setup(engine)
+
+    ids, cursor = search_page(db, "fractions", limit=2)
+    assert len(ids) == 2 and cursor is not None
+    rest, last_cursor = search_page(db, "fractions", cursor=cursor, limit=2)
+    assert last_cursor is None
+    assert sorted(ids + rest) == sorted(resource.id for resource in catalogue)
+
+    assert search_page(db, "fractions", language="sw") == ([], None)
+
+def test_search_filter_in_sort_order(db, catalogue):
+    search_index.setup(engine)
+    catalogue[1].view_count = 10
+    db.commit()
+
+    query = db.query(models.Resource).filter(search_filter("fract"))
+    rows, _ = keyset_page(query, resource_sort_keys("popular"), limit=10)
+    assert [row.id for row in rows] == [catalogue[1].id, catalogue[2].id, catalogue[0].id]
+    assert db.query(models.Resource).filter(search_filter("algebra")).count() == 0
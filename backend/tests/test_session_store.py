@@ -0,0 +1,41 @@
+# backend/tests/test_session_store.py
+import os
+import stat
+
+import pytest
+
+from app import models
+from app.session_store import (
+    SocketSessionStore, new_session_state, load_session_state, _private_address, _write_sessions
+)
+
+def test_recovers_search_state(db):
+    state = new_session_state("session-1", "+254700000000")
+    state.update(menu_level="search_results", search_term="fractions", page=1, depth=3)
+    _write_sessions([state])
+
+    recovered = load_session_state(db, "session-1")
+    assert recovered["menu_level"] == "search_results"
+    assert (recovered["search_term"], recovered["page"]) == ("fractions", 1)
+
+def test_search_screen_without_term_starts_over(db):
+    db.add(models.USSDSession(session_id="session-2", phone_number="+254700000000", menu_level="search_results"))
+    db.commit()
+
+    recovered = load_session_state(db, "session-2")
+    assert recovered == new_session_state("session-2", "+254700000000")
+
+def test_socket_store_needs_an_authkey():
+    with pytest.raises(RuntimeError):
+        SocketSessionStore(authkey=None)
+    assert SocketSessionStore(authkey="secret").authkey == b"secret"
+
+def test_socket_only_in_a_private_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+    with pytest.raises(RuntimeError):
+        _private_address(str(shared / "ussd.sock"))
+
+    address = _private_address(str(tmp_path / "private" / "ussd.sock"))
+    assert stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode) == 0o700
@@ -0,0 +1,11 @@
+# backend/tests/test_users.py
+from fastapi.testclient import TestClient
+
+from app import app
+from app.pagination import MAX_PAGE_SIZE
+
+def test_user_listing_page_size_is_capped(db, catalogue):
+    client = TestClient(app)
+    assert client.get("/api/v1/users/", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+    response = client.get("/api/v1/users/", params={"limit": 1})
+    assert response.status_code == 200 and len(response.json()) == 1
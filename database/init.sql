@@ -14,7 +14,8 @@ CREATE TABLE users (
     language_preference VARCHAR(10) DEFAULT 'en',
     is_teacher_verified BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_users_phone_number (phone_number)
 );
 
 -- Resources table for learning materials
@@ -23,6 +24,8 @@ CREATE TABLE resources (
     title VARCHAR(255) NOT NULL,
     description TEXT,
     file_path VARCHAR(255),
+    file_hash CHAR(64),
+    file_name VARCHAR(255),
     file_type ENUM('pdf', 'video', 'text', 'slides', 'link') NOT NULL,
     subject VARCHAR(100) NOT NULL,
     grade_level VARCHAR(50) NOT NULL,
@@ -33,7 +36,33 @@ CREATE TABLE resources (
     upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_approved BOOLEAN DEFAULT FALSE,
     view_count INT DEFAULT 0,
-    FOREIGN KEY (uploaded_by) REFERENCES users(id) ON DELETE CASCADE
+    rating_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    rating_average DOUBLE NOT NULL DEFAULT 0,
+    FOREIGN KEY (uploaded_by) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX ix_resources_file_hash (file_hash),
+    INDEX ix_resources_rating (is_approved, rating_average, id),
+    INDEX ix_resources_popular (is_approved, view_count, id),
+    INDEX ix_resources_approved (is_approved, id),
+    INDEX ix_resources_menu (is_approved, subject, grade_level, id, title),
+    INDEX ix_resources_region (is_approved, country, grade_level, language, id),
+    INDEX ix_resources_grade (is_approved, grade_level, id),
+    INDEX ix_resources_language (is_approved, language, id),
+    INDEX ix_resources_uploader (uploaded_by, id),
+    FULLTEXT INDEX ft_resources_search (title, description, tags)
+);
+
+-- Uploaded files, stored once per content hash
+CREATE TABLE blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size BIGINT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Translations table
@@ -45,7 +74,18 @@ CREATE TABLE translations (
     translated_description TEXT,
     translated_content TEXT, -- For text resources
     translation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE
+    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_translations_resource_language (resource_id, language)
+);
+
+-- Translations already produced, by digest of the source text
+CREATE TABLE translation_memo (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    source_digest CHAR(64) NOT NULL,
+    target_language VARCHAR(10) NOT NULL,
+    translated_text TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_translation_memo_digest_language (source_digest, target_language)
 );
 
 -- Ratings table
@@ -58,7 +98,8 @@ CREATE TABLE ratings (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    UNIQUE(user_id, resource_id)
+    UNIQUE KEY uq_ratings_user_resource (user_id, resource_id),
+    INDEX ix_ratings_resource (resource_id, id)
 );
 
 -- Text-to-speech cache table
@@ -67,8 +108,13 @@ CREATE TABLE text_to_speech (
     resource_id INT NOT NULL,
     language VARCHAR(10) NOT NULL,
     audio_path VARCHAR(255) NOT NULL,
+    digest CHAR(64),
+    size INT,
+    last_accessed DATETIME,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE
+    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_text_to_speech_resource_language (resource_id, language),
+    INDEX ix_text_to_speech_digest (digest)
 );
 
 -- Summaries table
@@ -78,7 +124,8 @@ CREATE TABLE summaries (
     language VARCHAR(10) NOT NULL,
     summary_text TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE
+    FOREIGN KEY (resource_id) REFERENCES resources(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_summaries_resource_language (resource_id, language)
 );
 
 -- USSD sessions table
@@ -90,10 +137,114 @@ CREATE TABLE ussd_sessions (
     selected_subject VARCHAR(100),
     selected_grade VARCHAR(50),
     selected_resource_id INT,
+    search_term VARCHAR(160),
+    page INT NOT NULL DEFAULT 0,
+    target_language VARCHAR(10),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_ussd_sessions_session_id (session_id)
+);
+
+-- Background jobs (translation, summarization, text-to-speech)
+CREATE TABLE jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    payload TEXT NOT NULL,
+    priority INT NOT NULL DEFAULT 5,
+    status ENUM('queued', 'running', 'succeeded', 'failed') NOT NULL DEFAULT 'queued',
+    dedupe_key VARCHAR(64),
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after DATETIME NOT NULL,
+    locked_by VARCHAR(100),
+    locked_at DATETIME,
+    result TEXT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_jobs_claim (status, priority, run_after, id),
+    INDEX ix_jobs_dedupe_key (dedupe_key)
+);
+
+-- Bulk catalogue imports and their resume checkpoints
+CREATE TABLE catalogue_imports (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    file_path VARCHAR(255) NOT NULL,
+    file_hash CHAR(64),
+    file_name VARCHAR(255),
+    format VARCHAR(10) NOT NULL,
+    status ENUM('queued', 'running', 'completed', 'failed') NOT NULL DEFAULT 'queued',
+    approve BOOLEAN NOT NULL DEFAULT FALSE,
+    uploaded_by INT NOT NULL,
+    rows_read INT NOT NULL DEFAULT 0,
+    rows_imported INT NOT NULL DEFAULT 0,
+    rows_failed INT NOT NULL DEFAULT 0,
+    errors TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (uploaded_by) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX ix_catalogue_imports_file_hash (file_hash)
+);
+
+-- Catalogue change feed for offline sync; id is the clients' cursor
+CREATE TABLE change_log (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INT NOT NULL,
+    resource_id INT,
+    op VARCHAR(10) NOT NULL,
+    changed_at DATETIME NOT NULL,
+    seq BIGINT,
+    txn VARCHAR(32),
+    INDEX ix_change_log_entity (entity, entity_id),
+    UNIQUE INDEX ix_change_log_seq (seq),
+    INDEX ix_change_log_txn (txn)
+);
+
+-- Numbers change_log entries in commit order, one row
+CREATE TABLE change_sequence (
+    id INT PRIMARY KEY,
+    last BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO change_sequence (id, last) VALUES (1, 0);
+
+-- Packed catalogue bundles, one per (country, grade_level, language)
+CREATE TABLE catalogue_bundles (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    country VARCHAR(50) NOT NULL,
+    grade_level VARCHAR(50) NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    generation INT NOT NULL DEFAULT 1,
+    built_generation INT NOT NULL DEFAULT 0,
+    version CHAR(16),
+    file_name VARCHAR(255),
+    previous_file_name VARCHAR(255),
+    size INT,
+    resource_count INT NOT NULL DEFAULT 0,
+    built_at DATETIME,
+    UNIQUE KEY uq_catalogue_bundles_key (country, grade_level, language)
+);
+
+-- Applied migrations, see backend/app/migrations.py. A database created
+-- from this file already has every change up to version 8.
+CREATE TABLE schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at DATETIME NOT NULL
 );
 
+INSERT INTO schema_migrations (version, name, applied_at) VALUES
+    (1, 'translation_unique_key', NOW()),
+    (2, 'blob_store_columns', NOW()),
+    (3, 'rating_aggregates', NOW()),
+    (4, 'rating_unique_key', NOW()),
+    (5, 'summary_unique_key', NOW()),
+    (6, 'tts_store_columns', NOW()),
+    (7, 'hot_path_indexes', NOW()),
+    (8, 'ussd_session_state', NOW()),
+    (9, 'change_log_commit_order', NOW());
+
 -- Insert initial admin user (password: admin123)
 INSERT INTO users (username, email, password_hash, role, is_teacher_verified) 
 VALUES ('admin', 'admin@africanlms.org', '$2b$12$Wz5lUZ5q5q5q5q5q5q5q5u5q5q5q5q5q5q5q5q5q5q5q5q5q5q5q', 'admin', TRUE);
\ No newline at end of file
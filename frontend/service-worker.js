@@ -0,0 +1,213 @@
+// frontend/service-worker.js
+const API_BASE_URL = 'http://localhost:8000/api/v1';
+const SHELL_CACHE = 'african-lms-shell-v1';
+const API_CACHE = 'african-lms-api-v1';
+// Regional catalogue bundles; their URLs change with their contents
+const BUNDLE_CACHE = 'african-lms-bundles-v1';
+const BUNDLE_ORIGIN = new URL(API_BASE_URL).origin;
+const SHELL_FILES = [
+    'index.html',
+    'student.html',
+    'teacher.html',
+    'style.css',
+    'manifest.json',
+    'js/app.js',
+    'js/student.js',
+    'js/teacher.js'
+];
+
+// Catalogue kept on the device, updated from the change feed
+const DB_NAME = 'african-lms';
+const DB_VERSION = 1;
+const SYNC_TAG = 'catalogue-sync';
+const SYNC_PAGE_SIZE = 500;
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            // One missing file should not stop the worker from installing
+            .then((cache) => Promise.all(SHELL_FILES.map((file) => cache.add(file).catch(() => null))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((keys) => Promise.all(
+                keys.filter((key) => ![SHELL_CACHE, API_CACHE, BUNDLE_CACHE].includes(key))
+                    .map((key) => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    if (request.url.startsWith(`${BUNDLE_ORIGIN}/bundles/`)) {
+        event.respondWith(
+            caches.match(request).then((cached) => cached || fetch(request))
+        );
+        return;
+    }
+
+    if (request.url.startsWith(API_BASE_URL)) {
+        // The change feed is always fetched live
+        if (!request.url.includes('/sync/')) {
+            event.respondWith(networkFirst(request));
+        }
+        return;
+    }
+
+    if (new URL(request.url).origin === self.location.origin) {
+        event.respondWith(
+            caches.match(request).then((cached) => cached || fetch(request))
+        );
+    }
+});
+
+// Serve API reads from the network, falling back to the last response seen
+async function networkFirst(request) {
+    const cache = await caches.open(API_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) {
+            return cached;
+        }
+        throw error;
+    }
+}
+
+self.addEventListener('sync', (event) => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(syncCatalogue());
+    }
+});
+
+// Pages ask for a sync with postMessage({type: 'sync'}) where Background Sync is missing
+self.addEventListener('message', (event) => {
+    if (event.data && event.data.type === 'sync') {
+        event.waitUntil(
+            syncCatalogue()
+                .then((changes) => notifyClients({type: 'synced', changes}))
+                .catch((error) => notifyClients({type: 'sync-failed', error: error.message}))
+        );
+    }
+    // {type: 'prefetch-bundle', country, grade_level, language}
+    if (event.data && event.data.type === 'prefetch-bundle') {
+        event.waitUntil(
+            prefetchBundle(event.data)
+                .then((bundle) => notifyClients({type: 'bundle-ready', bundle}))
+                .catch((error) => notifyClients({type: 'bundle-failed', error: error.message}))
+        );
+    }
+});
+
+// Download a region's whole catalogue in one request and keep only its
+// current version
+async function prefetchBundle({country, grade_level, language = 'en'}) {
+    const response = await fetch(`${API_BASE_URL}/bundles/`);
+    if (!response.ok) {
+        throw new Error(`Bundle list failed with status ${response.status}`);
+    }
+    const bundle = (await response.json()).find((item) =>
+        item.country === country && item.grade_level === grade_level && item.language === language
+    );
+    if (!bundle) {
+        return null;
+    }
+
+    const cache = await caches.open(BUNDLE_CACHE);
+    const url = `${BUNDLE_ORIGIN}${bundle.url}`;
+    // Older versions of this bundle: the same name before .<version>.msgpack
+    const prefix = url.slice(0, url.lastIndexOf('.', url.lastIndexOf('.') - 1) + 1);
+    if (!(await cache.match(url))) {
+        await cache.add(url);
+    }
+    const requests = await cache.keys();
+    await Promise.all(requests
+        .filter((request) => request.url.startsWith(prefix) && request.url !== url)
+        .map((request) => cache.delete(request)));
+    return bundle;
+}
+
+async function notifyClients(message) {
+    const clients = await self.clients.matchAll();
+    clients.forEach((client) => client.postMessage(message));
+}
+
+function promisify(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function transactionDone(transaction) {
+    return new Promise((resolve, reject) => {
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    });
+}
+
+function openCatalogue() {
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () => {
+        const db = request.result;
+        ['resources', 'translations', 'ratings'].forEach((store) => {
+            if (!db.objectStoreNames.contains(store)) {
+                db.createObjectStore(store, {keyPath: 'id'});
+            }
+        });
+        if (!db.objectStoreNames.contains('meta')) {
+            db.createObjectStore('meta', {keyPath: 'key'});
+        }
+    };
+    return promisify(request);
+}
+
+// Apply the change feed from the stored cursor until it is caught up.
+// Each page is written in one transaction together with its cursor, so an
+// interrupted sync continues where it stopped.
+async function syncCatalogue() {
+    const db = await openCatalogue();
+    const stored = await promisify(db.transaction('meta').objectStore('meta').get('cursor'));
+    let cursor = stored ? stored.value : 0;
+    let changes = 0;
+    let hasMore = true;
+
+    while (hasMore) {
+        const response = await fetch(`${API_BASE_URL}/sync/changes?since=${cursor}&limit=${SYNC_PAGE_SIZE}`);
+        if (!response.ok) {
+            throw new Error(`Sync failed with status ${response.status}`);
+        }
+        const feed = await response.json();
+
+        const transaction = db.transaction(['resources', 'translations', 'ratings', 'meta'], 'readwrite');
+        ['resources', 'translations', 'ratings'].forEach((store) => {
+            const objectStore = transaction.objectStore(store);
+            feed[store].forEach((row) => objectStore.put(row));
+            feed.deleted[store].forEach((id) => objectStore.delete(id));
+            changes += feed[store].length + feed.deleted[store].length;
+        });
+        transaction.objectStore('meta').put({key: 'cursor', value: feed.cursor});
+        await transactionDone(transaction);
+
+        cursor = feed.cursor;
+        hasMore = feed.has_more;
+    }
+
+    db.close();
+    return changes;
+}
@@ -24,6 +24,8 @@ async function loadResources(searchParams = {}) {
                 queryParams.append(key, searchParams[key]);
             }
         });
+        // Only what the cards below show
+        queryParams.append('fields', 'title,description,subject,grade_level,country,view_count');
         
         const response = await fetch(`${API_BASE_URL}/resources/?${queryParams}`);
         if (response.ok) {
@@ -62,12 +64,10 @@ document.getElementById('search-form').addEventListener('submit', (e) => {
         country: document.getElementById('search-country').value
     };
     
-    // Add search query if provided
+    // Add search query if provided (full-text search on title, description and tags)
     const searchQuery = document.getElementById('search-query').value;
     if (searchQuery) {
-        // Note: The backend would need to implement search functionality
-        // For now, we'll just use the subject field
-        searchParams.subject = searchQuery;
+        searchParams.q = searchQuery;
     }
     
     loadResources(searchParams);
@@ -79,8 +79,30 @@ function viewResource(resourceId) {
     alert(`Viewing resource ${resourceId}. This would show more details and options.`);
 }
 
+// Keep an offline copy of the catalogue in sync through the service worker
+async function registerCatalogueSync() {
+    if (!('serviceWorker' in navigator)) {
+        return;
+    }
+    try {
+        await navigator.serviceWorker.register('service-worker.js');
+        const registration = await navigator.serviceWorker.ready;
+        if ('sync' in registration) {
+            await registration.sync.register('catalogue-sync');
+        } else if (registration.active) {
+            registration.active.postMessage({type: 'sync'});
+        }
+    } catch (error) {
+        console.error('Error registering catalogue sync:', error);
+    }
+}
+
 // Initialize the student page
 document.addEventListener('DOMContentLoaded', () => {
     checkStudentAuth();
     loadResources(); // Load all resources initially
-});
\ No newline at end of file
+    registerCatalogueSync();
+});
+
+// Catch up as soon as the connection comes back
+window.addEventListener('online', registerCatalogueSync);
\ No newline at end of file